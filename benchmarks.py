@@ -0,0 +1,342 @@
+import time
+import pandas as pd
+import numpy as np
+
+"""
+--------------------------------------------
+------------ 1. BENCHMARK HELPERS ----------
+--------------------------------------------
+"""
+
+# Number of orders in the public Olist dataset, used as the 1x volume of the synthetic benchmarks
+OLIST_N_ORDERS = 99441
+
+
+# [Bench] Best wall time of a function over a number of repetitions
+def best_time(func, *args, repeat=3, **kwargs):
+    """
+    Args:
+    ----------
+    func: function to be timed [type: callable]
+    repeat: number of runs; the fastest one is kept [type: int, default: 3]
+    """
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args, **kwargs)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+"""
+--------------------------------------------
+-------- 2. CALENDAR FEATURE EXTRACTION ----
+--------------------------------------------
+"""
+
+# [Bench] Synthetic purchase timestamps spread over the Olist period (2016-09 to 2018-10)
+def synthetic_timestamps(n_rows, seed=42):
+    """
+    Args:
+    ----------
+    n_rows: number of timestamps to be generated [type: int]
+    seed: random seed [type: int, default: 42]
+    """
+
+    rng = np.random.default_rng(seed)
+    start, end = pd.Timestamp('2016-09-01').value, pd.Timestamp('2018-10-31').value
+    return pd.Series(pd.to_datetime(rng.integers(start, end, n_rows)), name='order_purchase_timestamp')
+
+
+# [Bench] Calendar features as originally built in eda.py: one pass (and one apply) per column
+def legacy_calendar_features(timestamps):
+    """
+    Args:
+    ----------
+    timestamps: purchase timestamps [type: pd.Series]
+    """
+
+    df = pd.DataFrame({'order_purchase_timestamp': timestamps})
+    df['order_purchase_year'] = df['order_purchase_timestamp'].dt.year
+    df['order_purchase_month'] = df['order_purchase_timestamp'].dt.month
+    df['order_purchase_month_name'] = df['order_purchase_timestamp'].dt.month_name()
+    df['order_purchase_quarter'] = df['order_purchase_timestamp'].dt.quarter
+    df['order_purchase_week_no'] = df['order_purchase_timestamp'].dt.isocalendar().week
+    df['order_purchase_day'] = df['order_purchase_timestamp'].dt.day_name()
+    df['order_purchase_hour'] = df['order_purchase_timestamp'].dt.hour
+    df['order_purchase_tod'] = df['order_purchase_timestamp'].dt.strftime('%H:%M:%S')
+    df['order_purchase_year_month'] = df['order_purchase_timestamp'].dt.strftime('%Y%m')
+    df['order_purchase_date'] = df['order_purchase_timestamp'].apply(lambda x: x.strftime('%Y%m%d'))
+    df['order_purchase_dayofweek'] = df['order_purchase_timestamp'].dt.dayofweek
+    df['order_purchase_dayofweek_name'] = df['order_purchase_timestamp'].apply(lambda x: x.strftime('%a'))
+    df['order_purchase_time_day'] = pd.cut(df['order_purchase_hour'], [-0.1, 6, 12, 18, 23],
+                                           labels=['Dawn', 'Morning', 'Afternoon', 'Night'])
+    return df
+
+
+# [Bench] Legacy per-column extraction versus calendar_features on scaled synthetic order volumes
+def benchmark_calendar_features(scales=(10, 100), repeat=1):
+    """
+    Args:
+    ----------
+    scales: multiples of the Olist order volume to be benchmarked [type: tuple, default: (10, 100)]
+    repeat: runs per measurement [type: int, default: 1]
+    """
+
+    from data_utils import calendar_features
+
+    results = []
+    for scale in scales:
+        timestamps = synthetic_timestamps(OLIST_N_ORDERS * scale)
+        legacy = best_time(legacy_calendar_features, timestamps, repeat=repeat)
+        vectorized = best_time(calendar_features, timestamps, repeat=repeat)
+        results.append({'scale': f'{scale}x', 'n_rows': len(timestamps), 'legacy_s': legacy,
+                        'vectorized_s': vectorized, 'speedup': legacy / vectorized})
+
+    return pd.DataFrame(results)
+
+
+"""
+--------------------------------------------
+---------- 3. TEXT CLEANING (REGEX) --------
+--------------------------------------------
+"""
+
+REVIEW_SNIPPETS = ['Não gostei do produto', 'chegou em 12/05/2018', 'paguei R$ 45,90 no frete', 'nao recomendo!!',
+                   'veja https://www.example.com/item?id=10', 'ñ veio a segunda unidade\r\n', 'ótimo   vendedor',
+                   'recebi 3 unidades\t', 'entrega rápida, produto muito bom', 'ainda não recebi meu pedido']
+
+
+# [Bench] Review corpus: the Olist review comments when available, synthetic reviews otherwise
+def review_corpus(n_docs=100000, path='data/', seed=42):
+    """
+    Args:
+    ----------
+    n_docs: number of documents [type: int, default: 100000]
+    path: directory holding the Olist CSV files [type: string, default: 'data/']
+    seed: random seed of the synthetic corpus [type: int, default: 42]
+    """
+
+    import os
+    from data_utils import OLIST_SCHEMAS, load_table
+
+    if os.path.exists(os.path.join(path, OLIST_SCHEMAS['olist_order_reviews']['file'])):
+        comments = load_table('olist_order_reviews', path)['review_comment_message'].dropna().tolist()
+        return (comments * (n_docs // len(comments) + 1))[:n_docs]
+
+    rng = np.random.default_rng(seed)
+    sizes = rng.integers(1, 6, n_docs)
+    picks = rng.integers(0, len(REVIEW_SNIPPETS), sizes.sum())
+    bounds = np.concatenate([[0], np.cumsum(sizes)])
+    return [' '.join(REVIEW_SNIPPETS[i] for i in picks[bounds[k]:bounds[k + 1]]) for k in range(n_docs)]
+
+
+# [Bench] The original ApplyRegex chain: one re.sub call (and one new list) per pattern over the whole corpus
+def legacy_regex_chain(text_list):
+    """
+    Args:
+    ----------
+    text_list: list object with text content to be prepared [type: list]
+    """
+
+    import re
+
+    text_list = [re.sub('[\n\r]', ' ', r) for r in text_list]
+    text_list = [re.sub(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\(\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', ' link ', r)
+                 for r in text_list]
+    text_list = [re.sub(r'([0-2][0-9]|(3)[0-1])(\/|\.)(((0)[0-9])|((1)[0-2]))(\/|\.)\d{2,4}', ' data ', r)
+                 for r in text_list]
+    text_list = [re.sub(r'[R]{0,1}\$[ ]{0,}\d+(,|\.)\d+', ' dinheiro ', r) for r in text_list]
+    text_list = [re.sub('[0-9]+', ' numero ', r) for r in text_list]
+    text_list = [re.sub('([nN][ãÃaA][oO]|[ñÑ]| [nN] )', ' negação ', r) for r in text_list]
+    text_list = [re.sub(r'\W', ' ', r) for r in text_list]
+    text_list = [re.sub(r'\s+', ' ', r) for r in text_list]
+    return [re.sub('[ \t]+$', '', r) for r in text_list]
+
+
+# [Bench] Throughput, in documents/sec, of the original regex chain and of the fused TextNormalizer
+def benchmark_regex_cleaning(corpus=None, repeat=3):
+    """
+    Args:
+    ----------
+    corpus: documents to be cleaned [type: list, default: review_corpus()]
+    repeat: runs per measurement [type: int, default: 3]
+    """
+
+    from text_utils import TextNormalizer
+
+    corpus = corpus if corpus is not None else review_corpus()
+    normalizer = TextNormalizer()
+    if normalizer.transform(corpus[:1000]) != legacy_regex_chain(corpus[:1000]):
+        raise AssertionError('TextNormalizer output differs from the original regex chain')
+
+    legacy = best_time(legacy_regex_chain, corpus, repeat=repeat)
+    fused = best_time(normalizer.transform, corpus, repeat=repeat)
+    return pd.DataFrame({
+        'method': ['legacy_chain', 'fused_normalizer'],
+        'seconds': [legacy, fused],
+        'docs_per_sec': [len(corpus) / legacy, len(corpus) / fused],
+    })
+
+
+"""
+--------------------------------------------
+-------- 4. STOPWORDS AND STEMMING ---------
+--------------------------------------------
+"""
+
+# [Bench] The original stopwords_removal: linear scan over a list and two lower() calls per token
+def legacy_stopwords_removal(text, cached_stopwords):
+    """
+    Args:
+    ----------
+    text: text where the stopwords will be removed [type: string]
+    cached_stopwords: stopwords to be applied on the process [type: list]
+    """
+
+    return [c.lower() for c in text.split() if c.lower() not in cached_stopwords]
+
+
+# [Bench] Seconds per million tokens of stopword filtering and of the stopwords + stemming steps
+def benchmark_stopwords(corpus=None, repeat=3):
+    """
+    Args:
+    ----------
+    corpus: documents to be processed [type: list, default: review_corpus(20000)]
+    repeat: runs per measurement [type: int, default: 3]
+    """
+
+    from nltk.corpus import stopwords
+    from text_utils import StemCache, stopwords_removal, stemming_process, stopwords_stemming
+
+    corpus = corpus if corpus is not None else review_corpus(20000)
+    stopword_list = stopwords.words('portuguese')
+    stopword_set = frozenset(stopword_list)
+    n_tokens = sum(len(doc.split()) for doc in corpus)
+
+    def legacy_filter():
+        return [legacy_stopwords_removal(doc, stopword_list) for doc in corpus]
+
+    def set_filter():
+        return [stopwords_removal(doc, stopword_set) for doc in corpus]
+
+    # Both stemming variants share a warm cache, so the timing isolates the tokenization round trip
+    stemmer = StemCache()
+    set_filter_stems = [stemming_process(' '.join(stopwords_removal(doc, stopword_set)), stemmer) for doc in corpus]
+
+    def legacy_stemming():
+        return [stemming_process(' '.join(legacy_stopwords_removal(doc, stopword_list)), stemmer) for doc in corpus]
+
+    def fused_stemming():
+        return [stopwords_stemming(doc, stopword_set, stemmer) for doc in corpus]
+
+    if legacy_filter() != set_filter() or fused_stemming() != set_filter_stems:
+        raise AssertionError('Stopword filtering output differs from the original implementation')
+
+    timings = {
+        'stopwords_list': best_time(legacy_filter, repeat=repeat),
+        'stopwords_frozenset': best_time(set_filter, repeat=repeat),
+        'stopwords_then_stemming': best_time(legacy_stemming, repeat=repeat),
+        'fused_stopwords_stemming': best_time(fused_stemming, repeat=repeat),
+    }
+    return pd.DataFrame({
+        'method': list(timings),
+        'seconds': list(timings.values()),
+        'seconds_per_million_tokens': [t * 1e6 / n_tokens for t in timings.values()],
+    })
+
+
+"""
+--------------------------------------------
+------ 5. SENTIMENT BUNDLE COLD START ------
+--------------------------------------------
+"""
+
+# Script run in a fresh interpreter: import, bundle load and first scoring call, each timed separately
+COLD_START_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from text_utils import SentimentBundle
+imported = time.perf_counter()
+bundle = SentimentBundle.load(sys.argv[1])
+loaded = time.perf_counter()
+bundle.score(json.loads(sys.argv[2]))
+scored = time.perf_counter()
+print(json.dumps({'import_s': imported - start, 'load_s': loaded - imported, 'first_score_s': scored - loaded,
+                  'total_s': scored - start}))
+"""
+
+
+# [Bench] Cold start of a scoring worker: fresh interpreter importing text_utils and scoring with a saved bundle
+def benchmark_bundle_cold_start(directory, texts=None, repeat=3):
+    """
+    Args:
+    ----------
+    directory: folder written by text_utils.save_sentiment_bundle [type: string]
+    texts: reviews scored by the first call [type: list, default: 100 reviews of review_corpus()]
+    repeat: number of fresh interpreters to be timed [type: int, default: 3]
+    """
+
+    import os
+    import json
+    import subprocess
+    import sys
+
+    texts = texts if texts is not None else review_corpus(100)
+    cwd = os.path.dirname(os.path.abspath(__file__))
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, '-c', COLD_START_SCRIPT, os.path.abspath(directory),
+                                 json.dumps(texts)], cwd=cwd, capture_output=True, text=True, check=True).stdout
+        process_s = time.perf_counter() - start
+        runs.append({**json.loads(output.strip().splitlines()[-1]), 'process_s': process_s})
+
+    return pd.DataFrame(runs)
+
+
+"""
+--------------------------------------------
+---------- 6. MODULE IMPORT TIME -----------
+--------------------------------------------
+"""
+
+# [Bench] Cumulative import time (python -X importtime) of the repo modules in fresh interpreters
+def benchmark_import_time(modules=('text_utils', 'viz_utils', 'text_pipeline'), repeat=3):
+    """
+    Args:
+    ----------
+    modules: modules to be imported, one fresh interpreter per import [type: tuple]
+    repeat: interpreters per module; the fastest import is kept [type: int, default: 3]
+    """
+
+    import os
+    import subprocess
+    import sys
+
+    cwd = os.path.dirname(os.path.abspath(__file__))
+    heavy = ('numpy', 'pandas', 'matplotlib', 'seaborn', 'nltk', 'sklearn')
+    results = []
+    for module in modules:
+        timings = []
+        for _ in range(repeat):
+            check = f'import sys; print(",".join(m for m in {heavy!r} if m in sys.modules))'
+            output = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}; {check}'],
+                                    cwd=cwd, capture_output=True, text=True, check=True)
+
+            # Lines are "import time: self [us] | cumulative | imported package"
+            for line in output.stderr.splitlines():
+                fields = line.split('|')
+                if len(fields) == 3 and fields[2].strip() == module:
+                    timings.append(int(fields[1]) / 1000)
+        results.append({'module': module, 'import_ms': min(timings), 'heavy_modules_loaded': output.stdout.strip()})
+
+    return pd.DataFrame(results)
+
+
+if __name__ == '__main__':
+    print(benchmark_calendar_features())
+    print(benchmark_regex_cleaning())
+    print(benchmark_stopwords())
+    print(benchmark_import_time())
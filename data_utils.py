@@ -0,0 +1,910 @@
+import os
+import pandas as pd
+import numpy as np
+
+"""
+--------------------------------------------
+------ 1. SCHEMAS FOR THE OLIST TABLES -----
+--------------------------------------------
+"""
+
+# Timestamps are parsed once at load time and measures are downcast to 32 bits, following the
+# data model in SQL/brazilian_ecommerce.sql. Coordinates keep float64 (DECIMAL(10, 7) precision).
+OLIST_SCHEMAS = {
+    'olist_customer': {
+        'file': 'olist_customers_dataset.csv',
+        'dtypes': {
+            'customer_zip_code_prefix': 'int32',
+            'customer_city': 'category',
+            'customer_state': 'category',
+        },
+        'parse_dates': [],
+    },
+    'olist_geolocation': {
+        'file': 'olist_geolocation_dataset.csv',
+        'dtypes': {
+            'geolocation_zip_code_prefix': 'int32',
+            'geolocation_lat': 'float64',
+            'geolocation_lng': 'float64',
+            'geolocation_city': 'category',
+            'geolocation_state': 'category',
+        },
+        'parse_dates': [],
+    },
+    'olist_orders': {
+        'file': 'olist_orders_dataset.csv',
+        'dtypes': {
+            'order_status': 'category',
+        },
+        'parse_dates': ['order_purchase_timestamp', 'order_approved_at', 'order_delivered_carrier_date',
+                        'order_delivered_customer_date', 'order_estimated_delivery_date'],
+    },
+    'olist_order_items': {
+        'file': 'olist_order_items_dataset.csv',
+        'dtypes': {
+            'order_item_id': 'int32',
+            'price': 'float32',
+            'freight_value': 'float32',
+        },
+        'parse_dates': ['shipping_limit_date'],
+    },
+    'olist_order_payments': {
+        'file': 'olist_order_payments_dataset.csv',
+        'dtypes': {
+            'payment_sequential': 'int32',
+            'payment_type': 'category',
+            'payment_installments': 'int32',
+            'payment_value': 'float32',
+        },
+        'parse_dates': [],
+    },
+    'olist_order_reviews': {
+        'file': 'olist_order_reviews_dataset.csv',
+        'dtypes': {
+            'review_score': 'int32',
+        },
+        'parse_dates': ['review_creation_date', 'review_answer_timestamp'],
+    },
+    'olist_products': {
+        'file': 'olist_products_dataset.csv',
+        'dtypes': {
+            'product_category_name': 'category',
+            'product_name_lenght': 'float32',
+            'product_description_lenght': 'float32',
+            'product_photos_qty': 'float32',
+            'product_weight_g': 'float32',
+            'product_length_cm': 'float32',
+            'product_height_cm': 'float32',
+            'product_width_cm': 'float32',
+        },
+        'parse_dates': [],
+    },
+    'olist_sellers': {
+        'file': 'olist_sellers_dataset.csv',
+        'dtypes': {
+            'seller_zip_code_prefix': 'int32',
+            'seller_city': 'category',
+            'seller_state': 'category',
+        },
+        'parse_dates': [],
+    },
+}
+
+
+"""
+--------------------------------------------
+------- 2. TYPED LOADER WITH ARROW CACHE ----
+--------------------------------------------
+"""
+
+# [Cache] Path of the Feather (Arrow IPC) file that caches a given table
+def cache_path(name, cache_dir):
+    """
+    Args:
+    ----------
+    name: table name, as in OLIST_SCHEMAS [type: string]
+    cache_dir: directory holding the Arrow cache files [type: string]
+    """
+
+    return os.path.join(cache_dir, name + '.feather')
+
+
+# [Cache] Checks whether the cache exists and is newer than its source CSV
+def is_cache_valid(csv_file, cache_file):
+    """
+    Args:
+    ----------
+    csv_file: path of the source CSV file [type: string]
+    cache_file: path of the Arrow cache file [type: string]
+    """
+
+    if not os.path.exists(cache_file):
+        return False
+    return os.path.getmtime(cache_file) >= os.path.getmtime(csv_file)
+
+
+# [Loader] Typed read of an Olist CSV following its declared schema
+def read_typed_csv(name, path='data/', **kwargs):
+    """
+    Args:
+    ----------
+    name: table name, as in OLIST_SCHEMAS [type: string]
+    path: directory holding the Olist CSV files [type: string, default: 'data/']
+    kwargs: extra arguments forwarded to pd.read_csv (e.g. chunksize, usecols) [type: dict]
+    """
+
+    schema = OLIST_SCHEMAS[name]
+    return pd.read_csv(os.path.join(path, schema['file']), dtype=schema['dtypes'],
+                       parse_dates=schema['parse_dates'], **kwargs)
+
+
+# [Loader] Reads an Olist table, using the memory-mapped Arrow cache when it is available
+def load_table(name, path='data/', cache_dir=None, use_cache=True):
+    """
+    Args:
+    ----------
+    name: table name, as in OLIST_SCHEMAS [type: string]
+    path: directory holding the Olist CSV files [type: string, default: 'data/']
+    cache_dir: directory for the Arrow cache [type: string, default: path + 'cache/']
+    use_cache: read from / write to the Arrow cache [type: bool, default: True]
+
+    Returns:
+    ----------
+    DataFrame with the dtypes declared in OLIST_SCHEMAS [type: pd.DataFrame]
+    """
+
+    csv_file = os.path.join(path, OLIST_SCHEMAS[name]['file'])
+    if not use_cache:
+        return read_typed_csv(name, path)
+
+    # pyarrow is only needed for the cache; without it the loader falls back to the typed CSV read
+    try:
+        from pyarrow import feather
+    except ImportError:
+        return read_typed_csv(name, path)
+
+    cache_dir = cache_dir if cache_dir is not None else os.path.join(path, 'cache')
+    cache_file = cache_path(name, cache_dir)
+    if is_cache_valid(csv_file, cache_file):
+        return feather.read_table(cache_file, memory_map=True).to_pandas()
+
+    df = read_typed_csv(name, path)
+    os.makedirs(cache_dir, exist_ok=True)
+    feather.write_feather(df, cache_file, compression='uncompressed')
+    return df
+
+
+# [Loader] Reads every Olist table into a {name: DataFrame} dictionary
+def load_olist_datasets(path='data/', names=None, cache_dir=None, use_cache=True):
+    """
+    Args:
+    ----------
+    path: directory holding the Olist CSV files [type: string, default: 'data/']
+    names: tables to be loaded [type: list, default: all tables in OLIST_SCHEMAS]
+    cache_dir: directory for the Arrow cache [type: string, default: path + 'cache/']
+    use_cache: read from / write to the Arrow cache [type: bool, default: True]
+    """
+
+    names = names if names is not None else list(OLIST_SCHEMAS.keys())
+    return {name: load_table(name, path, cache_dir, use_cache) for name in names}
+
+
+"""
+--------------------------------------------
+------- 3. DICTIONARY-ENCODED ID KEYS ------
+--------------------------------------------
+"""
+
+# 32-char hex identifiers shared across the Olist tables
+ID_COLUMNS = ['order_id', 'customer_id', 'customer_unique_id', 'product_id', 'seller_id', 'review_id']
+
+
+# [IDs] Maps each hex ID space to dense int32 codes shared by every table, keeping the reverse lookup
+class IdEncoder:
+
+    def __init__(self, id_columns=ID_COLUMNS):
+        self.id_columns = id_columns
+        self.uniques_ = {}
+
+    def fit(self, datasets):
+        """
+        Args:
+        ----------
+        datasets: tables whose ID columns make up the ID spaces [type: dict or list of pd.DataFrame]
+        """
+
+        frames = list(datasets.values()) if isinstance(datasets, dict) else list(datasets)
+        for col in self.id_columns:
+            values = [df[col] for df in frames if col in df.columns]
+            if not values:
+                continue
+            # A single hash pass over every occurrence of the ID, whichever table it comes from
+            _, uniques = pd.factorize(pd.concat(values, ignore_index=True), sort=False)
+            self.uniques_[col] = pd.Index(uniques)
+        return self
+
+    def encode(self, col, values):
+        """
+        Args:
+        ----------
+        col: ID space to be used (e.g. 'order_id') [type: string]
+        values: hex IDs to be encoded [type: pd.Series or array-like]
+
+        Returns:
+        ----------
+        int32 codes, with -1 for missing or unknown IDs [type: np.array]
+        """
+
+        return self.uniques_[col].get_indexer(values).astype('int32')
+
+    def decode(self, col, codes):
+        """
+        Args:
+        ----------
+        col: ID space to be used (e.g. 'order_id') [type: string]
+        codes: int32 codes produced by encode [type: np.array or pd.Series]
+        """
+
+        codes = np.asarray(codes)
+        uniques = self.uniques_[col]
+        return np.where(codes >= 0, uniques.take(np.clip(codes, 0, None)), None)
+
+    def transform(self, df):
+        """
+        Args:
+        ----------
+        df: table whose ID columns will be replaced by their int32 codes [type: pd.DataFrame]
+        """
+
+        df = df.copy()
+        for col in self.id_columns:
+            if col in df.columns and col in self.uniques_:
+                df[col] = self.encode(col, df[col])
+        return df
+
+    def decode_frame(self, df):
+        """
+        Args:
+        ----------
+        df: table with int32 ID codes to be translated back to hex IDs for output [type: pd.DataFrame]
+        """
+
+        df = df.copy()
+        for col in self.id_columns:
+            if col in df.columns and col in self.uniques_:
+                df[col] = self.decode(col, df[col])
+        return df
+
+
+# [IDs] Encodes the ID columns of every table with a single shared IdEncoder
+def encode_id_columns(datasets, encoder=None):
+    """
+    Args:
+    ----------
+    datasets: Olist tables, as returned by load_olist_datasets [type: dict]
+    encoder: already fitted encoder to be reused [type: IdEncoder, default: fitted on datasets]
+
+    Returns:
+    ----------
+    encoded: tables with int32 ID columns [type: dict]
+    encoder: encoder holding the reverse lookup of each ID space [type: IdEncoder]
+    """
+
+    if encoder is None:
+        encoder = IdEncoder().fit(datasets)
+    encoded = {name: encoder.transform(df) for name, df in datasets.items()}
+    return encoded, encoder
+
+
+"""
+--------------------------------------------
+------- 4. STAR-SCHEMA JOIN ENGINE ---------
+--------------------------------------------
+"""
+
+# [Join] Row positions of a left one-to-many join, computed by sorting the right keys once
+def left_join_positions(left_keys, right_keys):
+    """
+    Args:
+    ----------
+    left_keys: join keys of the left table (e.g. int32 order_id codes) [type: np.array]
+    right_keys: join keys of the right table [type: np.array]
+
+    Returns:
+    ----------
+    left_pos: row of the left table for each output row [type: np.array]
+    right_pos: row of the right table for each output row, -1 when there is no match [type: np.array]
+    """
+
+    left_keys = np.asarray(left_keys)
+    right_keys = np.asarray(right_keys)
+
+    # Stable sort keeps the right rows in their original order, as pd.merge does
+    order = np.argsort(right_keys, kind='stable')
+    sorted_keys = right_keys[order]
+    start = np.searchsorted(sorted_keys, left_keys, side='left')
+    counts = np.searchsorted(sorted_keys, left_keys, side='right') - start
+
+    # Unmatched left rows still produce one output row (left join)
+    n_rows = np.maximum(counts, 1)
+    left_pos = np.repeat(np.arange(len(left_keys)), n_rows)
+    offsets = np.arange(n_rows.sum()) - np.repeat(np.cumsum(n_rows) - n_rows, n_rows)
+    right_idx = np.repeat(start, n_rows) + offsets
+    matched = np.repeat(counts > 0, n_rows)
+    if len(order) == 0:
+        return left_pos, np.full(len(left_pos), -1)
+    right_pos = np.where(matched, order[np.minimum(right_idx, len(order) - 1)], -1)
+    return left_pos, right_pos
+
+
+# [Join] Fact table described by row positions into each of its tables, gathering only the requested columns
+class StarSchema:
+
+    def __init__(self, tables, positions=None):
+        """
+        Args:
+        ----------
+        tables: tables of the schema, in column-resolution order [type: dict of pd.DataFrame]
+        positions: row of each table for every fact row, -1 when missing [type: dict of np.array,
+                   default: identity over the first table]
+        """
+
+        self.tables = dict(tables)
+        if positions is None:
+            first = next(iter(self.tables))
+            positions = {first: np.arange(len(self.tables[first]))}
+        self.positions = {name: np.asarray(pos) for name, pos in positions.items()}
+
+    @classmethod
+    def from_left_join(cls, left, right, on, names=('left', 'right')):
+        """
+        Args:
+        ----------
+        left: table defining the left side of the join (e.g. orders) [type: pd.DataFrame]
+        right: table joined one-to-many on the left (e.g. order items) [type: pd.DataFrame]
+        on: join key column present in both tables [type: string]
+        names: names given to both tables inside the schema [type: tuple]
+        """
+
+        left_pos, right_pos = left_join_positions(left[on].values, right[on].values)
+        return cls({names[0]: left, names[1]: right}, {names[0]: left_pos, names[1]: right_pos})
+
+    def __len__(self):
+        return len(next(iter(self.positions.values())))
+
+    def gather(self, table, col):
+        """
+        Args:
+        ----------
+        table: name of the table holding the column [type: string]
+        col: column to be gathered at the fact grain [type: string]
+        """
+
+        pos = self.positions[table]
+        values = self.tables[table][col].array
+        if (pos < 0).any():
+            return pd.api.extensions.take(values, pos, allow_fill=True)
+        return values.take(pos)
+
+    def add_dimension(self, name, df, on, key=None, parent=None):
+        """
+        Args:
+        ----------
+        name: name of the dimension inside the schema [type: string]
+        df: dimension table, one row per key [type: pd.DataFrame]
+        on: foreign key column, looked up in the parent table [type: string]
+        key: primary key column of the dimension [type: string, default: on]
+        parent: table holding the foreign key [type: string, default: first table holding the column]
+        """
+
+        key = key if key is not None else on
+        parent = parent if parent is not None else self.table_of(on)
+        df = df.drop_duplicates(subset=key).reset_index(drop=True)
+
+        # Foreign key positions are resolved once; every later column gather reuses them
+        fk_values = self.gather(parent, on)
+        self.tables[name] = df
+        self.positions[name] = pd.Index(df[key]).get_indexer(fk_values)
+        return self
+
+    def table_of(self, col):
+        """
+        Args:
+        ----------
+        col: column to be located in the schema [type: string]
+        """
+
+        for name, df in self.tables.items():
+            if col in df.columns:
+                return name
+        raise KeyError(f'Column {col} not found in any table of the schema')
+
+    def columns(self, tables=None):
+        """
+        Args:
+        ----------
+        tables: tables whose columns will be listed [type: list, default: all tables]
+        """
+
+        tables = tables if tables is not None else list(self.tables.keys())
+        cols = []
+        for name in tables:
+            cols += [col for col in self.tables[name].columns if col not in cols]
+        return cols
+
+    def to_frame(self, columns=None, tables=None):
+        """
+        Args:
+        ----------
+        columns: columns to be gathered, each from the first table holding it [type: list,
+                 default: all columns of the selected tables]
+        tables: tables to be considered [type: list, default: all tables]
+        """
+
+        columns = columns if columns is not None else self.columns(tables)
+        return pd.DataFrame({col: self.gather(self.table_of(col), col) for col in columns})
+
+
+# [Cache] Fingerprint of a set of input files (name, size and modification time)
+def files_fingerprint(files):
+    """
+    Args:
+    ----------
+    files: paths of the input files [type: list]
+    """
+
+    import hashlib
+    digest = hashlib.sha1()
+    for file in sorted(files):
+        stat = os.stat(file)
+        digest.update(f'{os.path.basename(file)}:{stat.st_size}:{stat.st_mtime_ns};'.encode())
+    return digest.hexdigest()[:16]
+
+
+# [Cache] Fingerprint of the parameters a table is built with (JSON-serializable, sorted keys)
+def params_fingerprint(params):
+    """
+    Args:
+    ----------
+    params: builder parameters, e.g. {'version': 1, 'dimensions': [...]} [type: dict]
+    """
+
+    import hashlib
+    import json
+    payload = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+
+# [Cache] Reads a wide table from the Arrow cache keyed by its input files and builder parameters, building it
+# on a cache miss
+def load_cached_frame(name, files, build, columns=None, cache_dir='data/cache', params=None):
+    """
+    Args:
+    ----------
+    name: name of the cached table (e.g. 'order_items_fact') [type: string]
+    files: input files the table is built from [type: list]
+    build: function with no arguments returning the full table [type: callable]
+    columns: subset of columns to be returned [type: list, default: all columns]
+    cache_dir: directory for the Arrow cache [type: string, default: 'data/cache']
+    params: parameters of the builder (join, schema, encoder...) and a 'version' to be bumped whenever the
+            builder code changes; any change misses the cache [type: dict, default: None]
+    """
+
+    try:
+        from pyarrow import feather
+    except ImportError:
+        df = build()
+        return df if columns is None else df[columns]
+
+    cache_file = cache_path(f'{name}_{files_fingerprint(files)}_{params_fingerprint(params)}', cache_dir)
+    if os.path.exists(cache_file):
+        return feather.read_table(cache_file, columns=columns, memory_map=True).to_pandas()
+
+    df = build()
+    os.makedirs(cache_dir, exist_ok=True)
+    feather.write_feather(df, cache_file, compression='uncompressed')
+    return df if columns is None else df[columns]
+
+
+"""
+--------------------------------------------
+------- 5. CALENDAR FEATURE EXTRACTION -----
+--------------------------------------------
+"""
+
+MONTH_NAMES = ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August', 'September', 'October',
+               'November', 'December']
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+DAY_ABBR = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+HOURS_BINS = [6, 12, 18]
+HOURS_LABELS = ['Dawn', 'Morning', 'Afternoon', 'Night']
+
+
+# [Calendar] Derives every calendar feature of a timestamp column from integer arithmetic on datetime64
+def calendar_features(timestamps, prefix='order_purchase'):
+    """
+    Args:
+    ----------
+    timestamps: non-null timestamps (e.g. order_purchase_timestamp) [type: pd.Series]
+    prefix: prefix of the output column names [type: string, default: 'order_purchase']
+
+    Returns:
+    ----------
+    DataFrame aligned with timestamps, holding int32 and categorical features. Dates are encoded
+    as integers (yyyymm, yyyymmdd, hhmmss); year_month is kept as an ordered categorical of the
+    yyyymm strings for plotting [type: pd.DataFrame]
+    """
+
+    ts = pd.to_datetime(timestamps)
+    if ts.isna().any():
+        raise ValueError(f'{timestamps.name} has missing timestamps; drop or fill them before extracting features')
+
+    # Truncations of the same datetime64 array: every feature comes from these three casts
+    values = ts.values
+    days = values.astype('datetime64[D]')
+    months = values.astype('datetime64[M]')
+    years = values.astype('datetime64[Y]')
+
+    year = years.astype('int64') + 1970
+    month = (months - years.astype('datetime64[M]')).astype('int64') + 1
+    day = (days - months.astype('datetime64[D]')).astype('int64') + 1
+    seconds = (values - days.astype(values.dtype)) // np.timedelta64(1, 's')
+    hour = seconds // 3600
+    dayofweek = (days.astype('int64') + 3) % 7  # 1970-01-01 was a Thursday; Monday=0
+
+    # ISO week: week number of the Thursday of the same week, counted from its year's start
+    thursday = days - dayofweek.astype('timedelta64[D]') + np.timedelta64(3, 'D')
+    week_no = (thursday - thursday.astype('datetime64[Y]').astype('datetime64[D]')).astype('int64') // 7 + 1
+
+    yyyymm = year * 100 + month
+    month_keys = np.unique(yyyymm)
+    features = {
+        f'{prefix}_year': year,
+        f'{prefix}_month': month,
+        f'{prefix}_month_name': pd.Categorical.from_codes(month - 1, MONTH_NAMES, ordered=True),
+        f'{prefix}_quarter': (month - 1) // 3 + 1,
+        f'{prefix}_week_no': week_no,
+        f'{prefix}_day': pd.Categorical.from_codes(dayofweek, DAY_NAMES, ordered=True),
+        f'{prefix}_hour': hour,
+        f'{prefix}_tod': hour * 10000 + (seconds // 60 % 60) * 100 + seconds % 60,
+        f'{prefix}_yyyymm': yyyymm,
+        f'{prefix}_year_month': pd.Categorical.from_codes(np.searchsorted(month_keys, yyyymm),
+                                                          month_keys.astype(str), ordered=True),
+        f'{prefix}_date': yyyymm * 100 + day,
+        f'{prefix}_dayofweek': dayofweek,
+        f'{prefix}_dayofweek_name': pd.Categorical.from_codes(dayofweek, DAY_ABBR, ordered=True),
+        f'{prefix}_time_day': pd.Categorical.from_codes(np.searchsorted(HOURS_BINS, hour), HOURS_LABELS,
+                                                        ordered=True),
+    }
+    features = {col: (values.astype('int32') if isinstance(values, np.ndarray) else values)
+                for col, values in features.items()}
+    return pd.DataFrame(features, index=timestamps.index)
+
+
+"""
+--------------------------------------------
+------ 6. INCREMENTAL MONTHLY AGGREGATES ---
+--------------------------------------------
+"""
+
+AGGREGATE_KEYS = ['order_purchase_yyyymm', 'nome_regiao', 'customer_state', 'product_category_name']
+AGGREGATE_VALUES = ['price', 'freight_value']
+
+
+# [Aggregates] Materialized month x region x state x category store of counts, sums and sums of squares
+class MonthlyAggregateStore:
+
+    def __init__(self, keys=AGGREGATE_KEYS, values=AGGREGATE_VALUES):
+        """
+        Args:
+        ----------
+        keys: grouping keys, the first one being the int32 yyyymm month [type: list]
+        values: measures to be aggregated [type: list]
+        """
+
+        self.keys = keys
+        self.values = values
+        self.aggregates_ = None
+
+    @property
+    def month_col(self):
+        return self.keys[0]
+
+    def stat_columns(self):
+        cols = ['n_rows']
+        for col in self.values:
+            cols += [f'{col}_count', f'{col}_sum', f'{col}_sumsq']
+        return cols
+
+    def partial_aggregate(self, batch):
+        """
+        Args:
+        ----------
+        batch: order items holding the key and value columns [type: pd.DataFrame]
+        """
+
+        stats = {'n_rows': np.ones(len(batch), dtype='int64')}
+        for col in self.values:
+            values = batch[col].to_numpy(dtype='float64', na_value=np.nan)
+            filled = np.nan_to_num(values)
+            stats[f'{col}_count'] = (~np.isnan(values)).astype('int64')
+            stats[f'{col}_sum'] = filled
+            stats[f'{col}_sumsq'] = filled ** 2
+
+        # One grouped pass; categorical keys are only turned into plain values on the (small) result
+        frame = pd.DataFrame(stats, index=batch.index)
+        grouped = frame.groupby([batch[key] for key in self.keys], dropna=False, observed=True, sort=False).sum()
+        grouped = grouped.reset_index()
+        for key in self.keys:
+            if isinstance(grouped[key].dtype, pd.CategoricalDtype):
+                grouped[key] = grouped[key].astype(object)
+        return grouped
+
+    def update(self, batch):
+        """
+        Args:
+        ----------
+        batch: new order items to be merged into the store [type: pd.DataFrame]
+        """
+
+        partial = self.partial_aggregate(batch)
+        if self.aggregates_ is None:
+            self.aggregates_ = partial.sort_values(by=self.keys).reset_index(drop=True)
+            return self
+
+        # Months absent from the batch are kept untouched; only the touched months are re-summed
+        touched = self.aggregates_[self.month_col].isin(partial[self.month_col].unique())
+        merged = pd.concat([self.aggregates_[touched], partial], ignore_index=True)
+        merged = merged.groupby(self.keys, dropna=False, sort=False, as_index=False).sum()
+        self.aggregates_ = pd.concat([self.aggregates_[~touched], merged], ignore_index=True)
+        self.aggregates_ = self.aggregates_.sort_values(by=self.keys).reset_index(drop=True)
+        return self
+
+    def query(self, by, start=None, end=None):
+        """
+        Args:
+        ----------
+        by: keys to roll the store up to (e.g. ['order_purchase_yyyymm', 'nome_regiao']) [type: list]
+        start: first yyyymm month to be included [type: int, default: None]
+        end: last yyyymm month to be included [type: int, default: None]
+
+        Returns:
+        ----------
+        counts, sums, means and sample standard deviations per group, sorted by the keys [type: pd.DataFrame]
+        """
+
+        df = self.aggregates_
+        if start is not None:
+            df = df[df[self.month_col] >= start]
+        if end is not None:
+            df = df[df[self.month_col] <= end]
+
+        result = df.groupby(by, dropna=False, as_index=False)[self.stat_columns()].sum()
+        for col in self.values:
+            count = result[f'{col}_count']
+            result[f'{col}_mean'] = result[f'{col}_sum'] / count
+            variance = (result[f'{col}_sumsq'] - count * result[f'{col}_mean'] ** 2) / (count - 1)
+            result[f'{col}_std'] = np.sqrt(variance.clip(lower=0))
+        return result.sort_values(by=by).reset_index(drop=True)
+
+    def save(self, file):
+        """
+        Args:
+        ----------
+        file: path of the Feather file holding the store [type: string]
+        """
+
+        self.aggregates_.to_feather(file)
+
+    @classmethod
+    def load(cls, file, keys=AGGREGATE_KEYS, values=AGGREGATE_VALUES):
+        """
+        Args:
+        ----------
+        file: path of a Feather file written by save [type: string]
+        """
+
+        store = cls(keys, values)
+        store.aggregates_ = pd.read_feather(file)
+        return store
+
+
+"""
+--------------------------------------------
+------ 7. STREAMING CHUNKED PIPELINE -------
+--------------------------------------------
+"""
+
+# Bounding box used in eda.py to clip the geolocation points to the Brazilian map
+BRAZIL_BOUNDS = {
+    'geolocation_lat': (-33.75116944, 5.27438888),
+    'geolocation_lng': (-73.98283055, -34.79314722),
+}
+
+
+# [Streaming] Timestamp range covering the months start..end (both given as yyyymm integers)
+def month_window(start, end):
+    """
+    Args:
+    ----------
+    start: first month of the window (e.g. 201701) [type: int]
+    end: last month of the window, included (e.g. 201808) [type: int]
+    """
+
+    first = pd.Timestamp(year=start // 100, month=start % 100, day=1)
+    last = pd.Timestamp(year=end // 100, month=end % 100, day=1) + pd.offsets.MonthBegin(1)
+    return first, last - pd.Timedelta(1, 'ns')
+
+
+# [Streaming] Single boolean mask for a set of inclusive range filters
+def range_mask(df, filters):
+    """
+    Args:
+    ----------
+    df: chunk to be filtered [type: pd.DataFrame]
+    filters: {column: (low, high)} inclusive ranges; None leaves a side open [type: dict]
+    """
+
+    mask = np.ones(len(df), dtype=bool)
+    for col, (low, high) in filters.items():
+        values = df[col]
+        if low is not None:
+            mask &= (values >= low).to_numpy(dtype=bool, na_value=False)
+        if high is not None:
+            mask &= (values <= high).to_numpy(dtype=bool, na_value=False)
+    return mask
+
+
+# [Streaming] Reads an Olist table in chunks, with column projection and range filters pushed down
+def iter_chunks(name, path='data/', chunksize=500000, columns=None, filters=None, fmt='csv'):
+    """
+    Args:
+    ----------
+    name: table name, as in OLIST_SCHEMAS [type: string]
+    path: directory holding the source files [type: string, default: 'data/']
+    chunksize: maximum number of rows per chunk [type: int, default: 500000]
+    columns: columns to be read [type: list, default: all columns]
+    filters: {column: (low, high)} inclusive ranges applied before yielding [type: dict, default: None]
+    fmt: 'csv', or 'parquet' for a <table file>.parquet with the same name [type: string, default: 'csv']
+
+    Yields:
+    ----------
+    filtered chunks with the dtypes declared in OLIST_SCHEMAS [type: pd.DataFrame]
+    """
+
+    filters = filters if filters is not None else {}
+    schema = OLIST_SCHEMAS[name]
+    if fmt == 'parquet':
+        import pyarrow.dataset as ds
+
+        # Parquet filters are evaluated by Arrow, skipping row groups outside the ranges
+        expression = None
+        for col, (low, high) in filters.items():
+            for bound in [ds.field(col) >= low if low is not None else None,
+                          ds.field(col) <= high if high is not None else None]:
+                if bound is not None:
+                    expression = bound if expression is None else expression & bound
+        source = ds.dataset(os.path.join(path, schema['file'].replace('.csv', '.parquet')), format='parquet')
+        for batch in source.to_batches(columns=columns, filter=expression, batch_size=chunksize):
+            yield batch.to_pandas()
+        return
+
+    parse_dates = [col for col in schema['parse_dates'] if columns is None or col in columns]
+    dtypes = {col: dtype for col, dtype in schema['dtypes'].items() if columns is None or col in columns}
+    reader = pd.read_csv(os.path.join(path, schema['file']), usecols=columns, dtype=dtypes,
+                         parse_dates=parse_dates, chunksize=chunksize)
+    for chunk in reader:
+        if filters:
+            chunk = chunk[range_mask(chunk, filters)]
+        yield chunk
+
+
+# [Streaming] Group-by over a stream of chunks, combining per-chunk partial aggregates
+class ChunkedGroupBy:
+
+    # Partial aggregates that can be combined, and the function combining them
+    COMBINE = {'count': 'sum', 'size': 'sum', 'sum': 'sum', 'min': 'min', 'max': 'max', 'first': 'first'}
+
+    def __init__(self, by, aggs):
+        """
+        Args:
+        ----------
+        by: grouping columns [type: list]
+        aggs: {output column: (input column, function)}, function in 'count', 'size', 'sum', 'min',
+              'max', 'first' or 'mean' [type: dict]
+        """
+
+        self.by = by
+        self.aggs = aggs
+        self.partial_ = None
+
+    def partial_specs(self):
+        specs = {}
+        for out, (col, func) in self.aggs.items():
+            if func == 'mean':
+                specs[f'{out}__sum'] = (col, 'sum')
+                specs[f'{out}__count'] = (col, 'count')
+            elif func in self.COMBINE:
+                specs[out] = (col, func)
+            else:
+                raise ValueError(f'Aggregation {func} cannot be combined across chunks')
+        return specs
+
+    def update(self, chunk):
+        """
+        Args:
+        ----------
+        chunk: rows to be aggregated [type: pd.DataFrame]
+        """
+
+        specs = self.partial_specs()
+        partial = chunk.groupby(self.by, dropna=False, observed=True, as_index=False).agg(**specs)
+
+        # The running result is re-reduced at every chunk: memory is bounded by the number of groups
+        if self.partial_ is not None:
+            combine = {out: self.COMBINE[func] for out, (_, func) in specs.items()}
+            partial = pd.concat([self.partial_, partial], ignore_index=True)
+            partial = partial.groupby(self.by, dropna=False, observed=True, as_index=False).agg(combine)
+        self.partial_ = partial
+        return self
+
+    def result(self):
+        df = self.partial_.copy()
+        for out, (_, func) in self.aggs.items():
+            if func == 'mean':
+                df[out] = df.pop(f'{out}__sum') / df.pop(f'{out}__count')
+        return df.sort_values(by=self.by).reset_index(drop=True)
+
+
+# [Streaming] Order items of a month window, joined chunk by chunk to the orders and customers of that window
+def stream_order_items(path='data/', start=201701, end=201808, chunksize=500000, dimensions=None, fmt='csv'):
+    """
+    Args:
+    ----------
+    path: directory holding the source files [type: string, default: 'data/']
+    start: first purchase month, as yyyymm [type: int, default: 201701]
+    end: last purchase month, as yyyymm [type: int, default: 201808]
+    chunksize: order items per chunk [type: int, default: 500000]
+    dimensions: extra (name, df, on, key) dimensions joined to each chunk (e.g. br_info, geo_group)
+                [type: list, default: None]
+    fmt: 'csv' or 'parquet' [type: string, default: 'csv']
+
+    Yields:
+    ----------
+    order items of orders purchased inside the window, with order, customer and calendar columns.
+    Only the orders and customers of the window are kept in memory, besides the current chunk [type: pd.DataFrame]
+    """
+
+    window = {'order_purchase_timestamp': month_window(start, end)}
+    orders = pd.concat(iter_chunks('olist_orders', path, chunksize, filters=window, fmt=fmt), ignore_index=True)
+    orders = orders.join(calendar_features(orders['order_purchase_timestamp']))
+    customer_ids = pd.Index(orders['customer_id'].unique())
+    customers = pd.concat([chunk[customer_ids.get_indexer(chunk['customer_id']) >= 0]
+                           for chunk in iter_chunks('olist_customer', path, chunksize, fmt=fmt)], ignore_index=True)
+
+    for chunk in iter_chunks('olist_order_items', path, chunksize, fmt=fmt):
+        schema = StarSchema({'order_items': chunk})
+        schema.add_dimension('orders', orders, on='order_id')
+        schema.add_dimension('customers', customers, on='customer_id', parent='orders')
+        for name, df, on, key in (dimensions if dimensions is not None else []):
+            schema.add_dimension(name, df, on=on, key=key)
+        in_window = schema.positions['orders'] >= 0
+        yield schema.to_frame()[in_window].reset_index(drop=True)
+
+
+# [Streaming] Zip-prefix centroids of the geolocation points inside the Brazilian bounding box, read in chunks
+def stream_geo_group(path='data/', chunksize=500000, fmt='csv'):
+    """
+    Args:
+    ----------
+    path: directory holding the source files [type: string, default: 'data/']
+    chunksize: geolocation rows per chunk [type: int, default: 500000]
+    fmt: 'csv' or 'parquet' [type: string, default: 'csv']
+    """
+
+    aggs = {'geolocation_lat': ('geolocation_lat', 'mean'), 'geolocation_lng': ('geolocation_lng', 'mean'),
+            'geolocation_city': ('geolocation_city', 'first'), 'geolocation_state': ('geolocation_state', 'first')}
+    grouped = ChunkedGroupBy(by=['geolocation_zip_code_prefix'], aggs=aggs)
+    for chunk in iter_chunks('olist_geolocation', path, chunksize, filters=BRAZIL_BOUNDS, fmt=fmt):
+        grouped.update(chunk)
+    return grouped.result()
@@ -7,23 +7,29 @@ from matplotlib.gridspec import GridSpec
 import plotly.offline as py
 import plotly.express as px
 import plotly.graph_objs as go
-import json
 from viz_utils import *
+from data_utils import OLIST_SCHEMAS, load_olist_datasets, encode_id_columns, StarSchema, load_cached_frame, \
+    calendar_features, MonthlyAggregateStore, BRAZIL_BOUNDS
+from geo_utils import ZipPrefixIndex, load_br_info, state_regions, binned_heatmap, binned_markers, epoch_bins, \
+    epoch_heatmap_data
 import folium
-from folium.plugins import FastMarkerCluster, HeatMap, HeatMapWithTime
-import requests
+from folium.plugins import HeatMapWithTime
 from PIL import Image
 
-## Reading the files
+## Reading the files (typed schemas, cached as memory-mapped Arrow files after the first run)
 path = "data/"
-olist_customer = pd.read_csv(path + 'olist_customers_dataset.csv')
-olist_geolocation = pd.read_csv(path +'olist_geolocation_dataset.csv')
-olist_orders = pd.read_csv(path +'olist_orders_dataset.csv')
-olist_order_items = pd.read_csv(path+'olist_order_items_dataset.csv')
-olist_order_payments = pd.read_csv(path+'olist_order_payments_dataset.csv')
-olist_order_reviews = pd.read_csv(path+'olist_order_reviews_dataset.csv')
-olist_products = pd.read_csv(path+'olist_products_dataset.csv')
-olist_sellers = pd.read_csv(path+'olist_sellers_dataset.csv')
+olist_data = load_olist_datasets(path)
+
+## Hex IDs are dictionary-encoded into int32 keys shared by every table, so all merges run on integers
+olist_data, id_encoder = encode_id_columns(olist_data)
+olist_customer = olist_data['olist_customer']
+olist_geolocation = olist_data['olist_geolocation']
+olist_orders = olist_data['olist_orders']
+olist_order_items = olist_data['olist_order_items']
+olist_order_payments = olist_data['olist_order_payments']
+olist_order_reviews = olist_data['olist_order_reviews']
+olist_products = olist_data['olist_products']
+olist_sellers = olist_data['olist_sellers']
 
 ## An overview of the dataset
 datasets = [olist_customer, olist_geolocation, olist_orders, olist_order_items, 
@@ -45,36 +51,15 @@ data_info.style.background_gradient()
 
 ### Exploratory data analysis
 # Total orders in the e-commerce platform
-df_orders = olist_orders.merge(olist_customer, how = 'left', on ='customer_id')
+df_orders = StarSchema({'orders': olist_orders}).add_dimension('customers', olist_customer, on='customer_id').to_frame()
 fig, ax = plt.subplots(figsize = (14,6))
 single_countplot(df_orders, x ='order_status', ax = ax)
 plt.show()
 
 
-## Extract the time data type information from the dataset
-timestamp_cols = ['order_purchase_timestamp','order_approved_at','order_delivered_carrier_date','order_estimated_delivery_date']
-for col in timestamp_cols:
-    df_orders[col] = pd.to_datetime(df_orders[col])
-
-## Extract the attributes
-df_orders['order_purchase_year'] = df_orders['order_purchase_timestamp'].dt.year
-df_orders['order_purchase_month'] = df_orders['order_purchase_timestamp'].dt.month
-df_orders['order_purchase_month_name'] = df_orders['order_purchase_timestamp'].dt.month_name()
-df_orders['order_purchase_quarter'] = df_orders['order_purchase_timestamp'].dt.quarter
-df_orders['order_purchase_week_no'] = df_orders['order_purchase_timestamp'].dt.isocalendar().week
-df_orders['order_purchase_day'] = df_orders['order_purchase_timestamp'].dt.day_name()
-df_orders['order_purchase_hour'] = df_orders['order_purchase_timestamp'].dt.hour
-df_orders['order_purchase_tod'] = df_orders['order_purchase_timestamp'].dt.strftime('%H:%M:%S')
-df_orders['order_purchase_year_month'] = df_orders['order_purchase_timestamp'].dt.strftime('%Y%m')
-df_orders['order_purchase_date'] = df_orders['order_purchase_timestamp'].apply(lambda x: x.strftime('%Y%m%d'))
-df_orders['order_purchase_dayofweek'] = df_orders['order_purchase_timestamp'].dt.dayofweek
-df_orders['order_purchase_dayofweek_name'] = df_orders['order_purchase_timestamp'].apply(lambda x: x.strftime('%a'))
-
-
-## Bins the hours
-hours_bins = [-0.1, 6, 12, 18, 23]
-hours_labels = ['Dawn','Morning','Afternoon','Night']
-df_orders['order_purchase_time_day'] = pd.cut(df_orders['order_purchase_hour'], hours_bins, labels = hours_labels) ## review pd.cut code
+## Extract the attributes: every calendar feature in one vectorized pass (yyyymm / date / tod as int32,
+## names and hour bins (Dawn, Morning, Afternoon, Night) as categoricals)
+df_orders = df_orders.join(calendar_features(df_orders['order_purchase_timestamp']))
 
 ## Creating a figure and GridSpec to collect the visualizations
 fig = plt.figure(constrained_layout = True, figsize=(14,11))
@@ -151,42 +136,47 @@ plt.show()
 
 
 ### USing geo-location to analyze the Brazil e-commerce data
-df_orders_items = df_orders.merge(olist_order_items, how ='left', on='order_id')
-r = requests.get("https://servicodados.ibge.gov.br/api/v1/localidades/mesorregioes")
-content = [c['UF'] for c in json.loads(r.text)]
-br_info = pd.DataFrame(content)
-br_info['nome_regiao'] = br_info['regiao'].apply(lambda x: x['nome'])
-br_info.drop('regiao', axis =1, inplace =True)
-br_info.drop_duplicates(inplace= True)
+order_schema = StarSchema.from_left_join(df_orders, olist_order_items, on='order_id', names=('orders', 'order_items'))
+df_orders_items = order_schema.to_frame()
+## State -> region table bundled with the data (refresh from the IBGE API with load_br_info(path, refresh=True))
+br_info = load_br_info(path)
+
 
+## clipping locations to those within the Brazilian map (one fused mask) and indexing one centroid per zip prefix
+zip_index = ZipPrefixIndex.from_geolocation(olist_geolocation, bounds=BRAZIL_BOUNDS)
+olist_sellers = zip_index.geocode(olist_sellers, 'seller_zip_code_prefix', prefix='seller_')
 
-## clipping locations to those within the Brazilian map
-geo_prep = olist_geolocation[olist_geolocation.geolocation_lat <= 5.27438888]
-geo_prep = geo_prep[geo_prep.geolocation_lng >= -73.98283055]
-geo_prep = geo_prep[geo_prep.geolocation_lat >= -33.75116944]
-geo_prep = geo_prep[geo_prep.geolocation_lng <= -34.79314722]
+## Merging all information: foreign-key positions are resolved once, customers are geocoded against the
+## zip-prefix index and the wide fact table is cached on disk, keyed by the input files it is built from and
+## by the join/schema parameters (bump 'version' whenever build_order_items_fact changes)
+order_schema.add_dimension('products', olist_products, on='product_id')
+fact_tables = ['olist_orders', 'olist_customer', 'olist_order_items', 'olist_geolocation', 'olist_products']
+fact_files = [path + OLIST_SCHEMAS[name]['file'] for name in fact_tables] + [path + 'BRA_adm1.csv']
+fact_params = {'version': 1, 'schemas': {name: OLIST_SCHEMAS[name] for name in fact_tables},
+               'columns': order_schema.columns(), 'bounds': BRAZIL_BOUNDS}
 
-geo_group = geo_prep.groupby(by = 'geolocation_zip_code_prefix', as_index = False).min()
+def build_order_items_fact():
+    df = zip_index.geocode(order_schema.to_frame(), 'customer_zip_code_prefix')
+    df['nome_regiao'] = state_regions(df['customer_state'], br_info)
+    return df
 
-## Merging all information
-df_order_items = df_orders_items.merge(br_info, how ='left', left_on ='customer_state', right_on ='sigla')
-df_order_items = df_order_items.merge(geo_group, how ='left', 
-                    left_on = 'customer_zip_code_prefix',
-                    right_on= 'geolocation_zip_code_prefix')
+df_order_items = load_cached_frame('order_items_fact', fact_files, build_order_items_fact, params=fact_params)
 
 df_orders_items.head()
 
 
 ### A summary of the orders by region, state and city
-df_orders_filt = df_order_items[(df_order_items['order_purchase_year_month'].astype(int) >= 201701)]
-df_orders_filt = df_orders_filt[(df_orders_filt['order_purchase_year_month'].astype(int) <= 201808)]
+df_orders_filt = df_order_items[df_order_items['order_purchase_yyyymm'].between(201701, 201808)]
 
-# Groupng the data filter by region
-df_regions_group = df_orders_filt.groupby(by=['order_purchase_year_month','nemo_regiao'], as_index = False)
-df_regions_group = df_regions_group.agg({'customer_id':'count', 'price':'sum'}).sort_values(by='order_purchase_year_month')
+## Month x region x state x category aggregates: new order batches are merged with month_store.update(batch)
+## instead of regrouping the whole history
+month_store = MonthlyAggregateStore().update(df_order_items)
 
+# Groupng the data filter by region
+df_regions_group = month_store.query(by=['order_purchase_yyyymm', 'nome_regiao'], start=201701, end=201808)
+df_regions_group = df_regions_group.loc[:, ['order_purchase_yyyymm', 'nome_regiao', 'n_rows', 'price_sum']]
 df_regions_group.columns = ['month', 'region','order_count','order_amount']
-df_regions_group.reset_index(drop = True, inplace= True)
+df_regions_group['month'] = df_regions_group['month'].astype(str)
 
 ### Group the data by city and get only the top 10 cities
 df_cities_group = df_orders_filt.groupby(by="geolocation_city", as_index= False).count().loc[:,['geolocation_city', 'order_id']]
@@ -226,32 +216,28 @@ ax3.set_ylabel('State')
 ax3.set_xlabel('Order Volume')
 
 
-## What about locations, spatial is special
-lats = list(df_order_items.query('order_purchase_year == 2018')['geolocation_lat'].dropna().values)[:30000]
-longs = list(df_order_items.query('order_purchase_year == 2018')['geolocation_lng'].dropna().values)[:30000]
-locations = list(zip(lats, longs))
+## What about locations, spatial is special: orders are pre-binned into quadtree cells, so the map payload
+## depends on the covered area and not on the number of orders
+df_orders_2018 = df_order_items[df_order_items['order_purchase_year'] == 2018]
 
-map1 = folium.Map(location = [-15, 50], zoom_start = 4.0)
-FastMarkerCluster(data = locations).add_to(map1)
+map1 = folium.Map(location = [-15, -50], zoom_start = 4.0)
+binned_markers(df_orders_2018['geolocation_lat'], df_orders_2018['geolocation_lng'], zoom = 6).add_to(map1)
 map1
 
 ## Heat maps
 map2 = folium.Map(location = [-15, -50], zoom_start = 4.0)
-heat_data = df_orders_filt.groupby(by=['geolocation_lat','geolocation_lng'], as_index=False).count().iloc[:, :3]
-HeatMap(name='Orders heat map', data = heat_data, radius = 10, max_zoom = 13).add_to(map2)
+binned_heatmap(df_orders_filt['geolocation_lat'], df_orders_filt['geolocation_lng'], zoom = 8,
+               name = 'Orders heat map', radius = 10, max_zoom = 13).add_to(map2)
 map2
 
-## Heat map with time to see the trends in e-commerce over time
-epoch_list = []
-heatmap_evl_data = df_orders_items[(df_orders_items['order_purchase_year_month'].astype(int) >= 201801)] ## Greater than January 2018
-heatmap_evl_data = heatmap_evl_data[(heatmap_evl_data['order_purchase_year_month'].astype(int) <= 201807 )] ## Less that July 2018
-time_index = heatmap_evl_data['order_purchase_year_month'].sort_values().unique()
-
-for epoch in time_index:
-    data_temp = heatmap_evl_data.query('order_purchase_year_month == @epoch')
-    data_temp = data_temp.groupby(by=['geolocation_lat', 'geolocation_lng'], as_index= False).count()
-    data_temp = data_temp.sort_values(by = ['order_id'], ascending=False).iloc[:, :3]
-    epoch_list.append(data_temp.values.tolist())
+## Heat map with time to see the trends in e-commerce over time: every month's weighted points come from
+## a single grouped pass over (month, lat-bin, lng-bin)
+heatmap_evl_data = df_order_items[df_order_items['order_purchase_yyyymm'].between(201801, 201807)] ## January to July 2018
+heatmap_evl_data = heatmap_evl_data[heatmap_evl_data['order_id'].notna()]
+time_index, epoch_offsets, epoch_points = epoch_bins(heatmap_evl_data['order_purchase_yyyymm'],
+                                                     heatmap_evl_data['geolocation_lat'],
+                                                     heatmap_evl_data['geolocation_lng'], zoom = 8)
+epoch_list = epoch_heatmap_data(time_index, epoch_offsets, epoch_points)
 
 ## Creating a map using Folium
 map3 = folium.Map(
@@ -262,16 +248,15 @@ map3 = folium.Map(
 HeatMapWithTime(name = 'Trends in e-commerce in space time',
                 data = epoch_list, 
                 radius = 10, 
-                index = list(time_index)).add_to(map3)
+                index = [str(epoch) for epoch in time_index]).add_to(map3)
 
 
 ## REVENUE FROM THE E-COMMERCE
-df_month_aggreg = df_orders_filt.groupby(by=['order_purchase_year','order_purchase_year_month'], as_index=False)
-df_month_aggreg = df_month_aggreg.agg({
-    'order_count': 'count',
-    'price':'sum',
-    'freight_value':'sum'
-})
+df_month_aggreg = month_store.query(by=['order_purchase_yyyymm'], start=201701, end=201808)
+df_month_aggreg = df_month_aggreg.rename(columns={'n_rows': 'order_count', 'price_sum': 'price',
+                                                  'freight_value_sum': 'freight_value'})
+df_month_aggreg['order_purchase_year'] = df_month_aggreg['order_purchase_yyyymm'] // 100
+df_month_aggreg['order_purchase_year_month'] = df_month_aggreg['order_purchase_yyyymm'].astype(str)
 
 ## Adding new other columns to the dataframe
 df_month_aggreg['avg_price_per_order'] = df_month_aggreg['price'] / df_month_aggreg['order_count']
@@ -0,0 +1,531 @@
+import os
+import pandas as pd
+import numpy as np
+from data_utils import BRAZIL_BOUNDS, range_mask
+
+"""
+--------------------------------------------
+------- 1. ZIP-PREFIX CENTROID TABLE -------
+--------------------------------------------
+"""
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+# [Geo] One centroid per zip prefix, with O(1) prefix -> coordinate lookup through a direct-address array
+class ZipPrefixIndex:
+
+    def __init__(self, prefixes, lat, lng, city=None, state=None):
+        """
+        Args:
+        ----------
+        prefixes: sorted, unique zip code prefixes [type: np.array]
+        lat: centroid latitude of each prefix [type: np.array]
+        lng: centroid longitude of each prefix [type: np.array]
+        city: city of each prefix [type: np.array or pd.Categorical, default: None]
+        state: state of each prefix [type: np.array or pd.Categorical, default: None]
+        """
+
+        self.prefixes = np.asarray(prefixes)
+        self.lat = np.asarray(lat)
+        self.lng = np.asarray(lng)
+        self.city = city
+        self.state = state
+
+        # Zip prefixes are at most 5 digits, so a dense array maps any prefix to its row
+        self.lookup = np.full(int(self.prefixes.max()) + 1 if len(self.prefixes) else 1, -1, dtype='int32')
+        self.lookup[self.prefixes] = np.arange(len(self.prefixes), dtype='int32')
+        self._grid = None
+
+    @classmethod
+    def from_geolocation(cls, geolocation, bounds=BRAZIL_BOUNDS):
+        """
+        Args:
+        ----------
+        geolocation: olist_geolocation table [type: pd.DataFrame]
+        bounds: {column: (low, high)} box the points are clipped to in one fused pass [type: dict,
+                default: BRAZIL_BOUNDS]
+        """
+
+        if bounds:
+            geolocation = geolocation[range_mask(geolocation, bounds)]
+
+        # Sort-based grouping: centroid from weighted bincounts, city/state from the first point of the prefix
+        prefixes, first, inverse, counts = np.unique(geolocation['geolocation_zip_code_prefix'].values,
+                                                     return_index=True, return_inverse=True, return_counts=True)
+        lat = np.bincount(inverse, weights=geolocation['geolocation_lat'].values) / counts
+        lng = np.bincount(inverse, weights=geolocation['geolocation_lng'].values) / counts
+        city = geolocation['geolocation_city'].array.take(first)
+        state = geolocation['geolocation_state'].array.take(first)
+        return cls(prefixes, lat, lng, city, state)
+
+    def __len__(self):
+        return len(self.prefixes)
+
+    def positions(self, zip_prefixes):
+        """
+        Args:
+        ----------
+        zip_prefixes: zip code prefixes to be resolved [type: np.array or pd.Series]
+
+        Returns:
+        ----------
+        row of each prefix in the index, -1 for unknown prefixes [type: np.array]
+        """
+
+        zip_prefixes = np.asarray(zip_prefixes)
+        valid = (zip_prefixes >= 0) & (zip_prefixes < len(self.lookup))
+        pos = np.full(len(zip_prefixes), -1, dtype='int32')
+        pos[valid] = self.lookup[zip_prefixes[valid].astype('int64')]
+        return pos
+
+    def geocode(self, df, zip_col, prefix='geolocation_'):
+        """
+        Args:
+        ----------
+        df: table holding a zip code prefix column (e.g. customers, sellers) [type: pd.DataFrame]
+        zip_col: name of the zip code prefix column [type: string]
+        prefix: prefix of the added lat, lng, city and state columns [type: string, default: 'geolocation_']
+        """
+
+        pos = self.positions(df[zip_col].values)
+        df = df.copy()
+        df[prefix + 'lat'] = np.where(pos >= 0, self.lat[pos], np.nan)
+        df[prefix + 'lng'] = np.where(pos >= 0, self.lng[pos], np.nan)
+        for name, values in [('city', self.city), ('state', self.state)]:
+            if values is not None:
+                df[prefix + name] = pd.api.extensions.take(pd.array(values), pos, allow_fill=True)
+        return df
+
+    def to_frame(self):
+        return pd.DataFrame({
+            'geolocation_zip_code_prefix': self.prefixes,
+            'geolocation_lat': self.lat,
+            'geolocation_lng': self.lng,
+            'geolocation_city': self.city,
+            'geolocation_state': self.state,
+        })
+
+    @property
+    def grid(self):
+        if self._grid is None:
+            self._grid = GridIndex(self.lat, self.lng)
+        return self._grid
+
+    def query_bbox(self, lat_min, lat_max, lng_min, lng_max):
+        """
+        Args:
+        ----------
+        lat_min, lat_max, lng_min, lng_max: box to be searched, in degrees [type: float]
+
+        Returns:
+        ----------
+        zip code prefixes whose centroid lies inside the box [type: np.array]
+        """
+
+        return self.prefixes[np.sort(self.grid.query_bbox(lat_min, lat_max, lng_min, lng_max))]
+
+    def query_radius(self, lat, lng, radius_km):
+        """
+        Args:
+        ----------
+        lat, lng: center of the search, in degrees [type: float]
+        radius_km: search radius, in kilometers [type: float]
+
+        Returns:
+        ----------
+        zip code prefixes whose centroid lies within the radius [type: np.array]
+        """
+
+        return self.prefixes[np.sort(self.grid.query_radius(lat, lng, radius_km))]
+
+
+"""
+--------------------------------------------
+-------- 2. GRID INDEX FOR POINT QUERIES ---
+--------------------------------------------
+"""
+
+# [Geo] Great-circle distance, in kilometers, between a point and arrays of points
+def haversine_km(lat, lng, lats, lngs):
+    """
+    Args:
+    ----------
+    lat, lng: reference point, in degrees [type: float]
+    lats, lngs: points to be measured, in degrees [type: np.array]
+    """
+
+    lat, lng, lats, lngs = map(np.radians, (lat, lng, lats, lngs))
+    a = np.sin((lats - lat) / 2) ** 2 + np.cos(lat) * np.cos(lats) * np.sin((lngs - lng) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+# [Geo] Regular lat/lng grid with points sorted by cell (CSR layout), for box and radius queries
+class GridIndex:
+
+    def __init__(self, lat, lng, cell_size=0.5):
+        """
+        Args:
+        ----------
+        lat: latitude of the points, in degrees [type: np.array]
+        lng: longitude of the points, in degrees [type: np.array]
+        cell_size: side of each grid cell, in degrees [type: float, default: 0.5]
+        """
+
+        lat = np.asarray(lat, dtype='float64')
+        lng = np.asarray(lng, dtype='float64')
+        self.cell_size = cell_size
+        self.lat_origin = lat.min() if len(lat) else 0.0
+        self.lng_origin = lng.min() if len(lng) else 0.0
+        rows = ((lat - self.lat_origin) // cell_size).astype('int64')
+        cols = ((lng - self.lng_origin) // cell_size).astype('int64')
+        self.n_rows = int(rows.max()) + 1 if len(lat) else 1
+        self.n_cols = int(cols.max()) + 1 if len(lng) else 1
+
+        # Points of a cell are contiguous; offsets[c]:offsets[c + 1] is the slice of cell c
+        cells = rows * self.n_cols + cols
+        self.order = np.argsort(cells, kind='stable')
+        self.offsets = np.searchsorted(cells[self.order], np.arange(self.n_rows * self.n_cols + 1))
+        self.lat = lat[self.order]
+        self.lng = lng[self.order]
+
+    def candidates(self, lat_min, lat_max, lng_min, lng_max):
+        """
+        Args:
+        ----------
+        lat_min, lat_max, lng_min, lng_max: box to be searched, in degrees [type: float]
+
+        Returns:
+        ----------
+        positions, in cell order, of the points lying in cells that touch the box [type: np.array]
+        """
+
+        row_min = max(int((lat_min - self.lat_origin) // self.cell_size), 0)
+        row_max = min(int((lat_max - self.lat_origin) // self.cell_size), self.n_rows - 1)
+        col_min = max(int((lng_min - self.lng_origin) // self.cell_size), 0)
+        col_max = min(int((lng_max - self.lng_origin) // self.cell_size), self.n_cols - 1)
+        if row_min > row_max or col_min > col_max:
+            return np.array([], dtype='int64')
+
+        # Cells of one grid row are adjacent in the sorted arrays: one slice per grid row
+        slices = [np.arange(self.offsets[row * self.n_cols + col_min], self.offsets[row * self.n_cols + col_max + 1])
+                  for row in range(row_min, row_max + 1)]
+        return np.concatenate(slices)
+
+    def query_bbox(self, lat_min, lat_max, lng_min, lng_max):
+        """
+        Args:
+        ----------
+        lat_min, lat_max, lng_min, lng_max: box to be searched, in degrees [type: float]
+
+        Returns:
+        ----------
+        original positions of the points inside the box [type: np.array]
+        """
+
+        idx = self.candidates(lat_min, lat_max, lng_min, lng_max)
+        lat, lng = self.lat[idx], self.lng[idx]
+        inside = (lat >= lat_min) & (lat <= lat_max) & (lng >= lng_min) & (lng <= lng_max)
+        return self.order[idx[inside]]
+
+    def query_radius(self, lat, lng, radius_km):
+        """
+        Args:
+        ----------
+        lat, lng: center of the search, in degrees [type: float]
+        radius_km: search radius, in kilometers [type: float]
+
+        Returns:
+        ----------
+        original positions of the points within the radius [type: np.array]
+        """
+
+        dlat = np.degrees(radius_km / EARTH_RADIUS_KM)
+        dlng = dlat / max(np.cos(np.radians(lat)), 1e-6)
+        idx = self.candidates(lat - dlat, lat + dlat, lng - dlng, lng + dlng)
+        inside = haversine_km(lat, lng, self.lat[idx], self.lng[idx]) <= radius_km
+        return self.order[idx[inside]]
+
+
+"""
+--------------------------------------------
+------ 3. PRE-BINNED HEATMAP CELLS ---------
+--------------------------------------------
+"""
+
+# Bins per web-map tile side: a 256px tile is split into 8px cells
+BINS_PER_TILE = 32
+
+
+# [Heatmap] Side, in degrees, of the quadtree cells used at a given map zoom level
+def zoom_cell_size(zoom):
+    """
+    Args:
+    ----------
+    zoom: web-map zoom level (a tile spans 360 / 2 ** zoom degrees) [type: int]
+    """
+
+    return 360.0 / (2 ** zoom * BINS_PER_TILE)
+
+
+# [Heatmap] Aggregates points into the quadtree cells of a zoom level, in one vectorized pass
+def quadtree_bins(lat, lng, weights=None, zoom=6):
+    """
+    Args:
+    ----------
+    lat: latitude of the points [type: np.array or pd.Series]
+    lng: longitude of the points [type: np.array or pd.Series]
+    weights: weight of each point [type: np.array, default: 1 per point]
+    zoom: zoom level defining the cell size; cells of consecutive levels nest [type: int, default: 6]
+
+    Returns:
+    ----------
+    one row per non-empty cell with the weighted centroid of its points and the summed weight.
+    The number of rows is bounded by the covered area, not by the number of points [type: pd.DataFrame]
+    """
+
+    lat = np.asarray(lat, dtype='float64')
+    lng = np.asarray(lng, dtype='float64')
+    weights = np.ones(len(lat)) if weights is None else np.asarray(weights, dtype='float64')
+    valid = np.isfinite(lat) & np.isfinite(lng) & np.isfinite(weights)
+    lat, lng, weights = lat[valid], lng[valid], weights[valid]
+
+    # Cells are anchored at (-90, -180), so each cell splits into four cells at the next zoom level
+    cell_size = zoom_cell_size(zoom)
+    n_cols = 2 ** zoom * BINS_PER_TILE
+    cells = ((lat + 90) // cell_size).astype('int64') * n_cols + ((lng + 180) // cell_size).astype('int64')
+    _, inverse = np.unique(cells, return_inverse=True)
+
+    weight = np.bincount(inverse, weights=weights)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cell_lat = np.bincount(inverse, weights=lat * weights) / weight
+        cell_lng = np.bincount(inverse, weights=lng * weights) / weight
+    return pd.DataFrame({'lat': cell_lat, 'lng': cell_lng, 'weight': weight})
+
+
+# [Heatmap] Pre-binned cells for several zoom levels
+def multi_zoom_bins(lat, lng, weights=None, zooms=(4, 6, 8, 10)):
+    """
+    Args:
+    ----------
+    lat: latitude of the points [type: np.array or pd.Series]
+    lng: longitude of the points [type: np.array or pd.Series]
+    weights: weight of each point [type: np.array, default: 1 per point]
+    zooms: zoom levels to be binned [type: tuple, default: (4, 6, 8, 10)]
+    """
+
+    return {zoom: quadtree_bins(lat, lng, weights, zoom) for zoom in zooms}
+
+
+# [Heatmap] folium HeatMap layer fed with pre-weighted cells instead of raw points
+def binned_heatmap(lat, lng, weights=None, zoom=6, name='Orders heat map', **kwargs):
+    """
+    Args:
+    ----------
+    lat: latitude of the points [type: np.array or pd.Series]
+    lng: longitude of the points [type: np.array or pd.Series]
+    weights: weight of each point [type: np.array, default: 1 per point]
+    zoom: zoom level of the cells [type: int, default: 6]
+    name: name of the layer [type: string, default: 'Orders heat map']
+    kwargs: extra arguments forwarded to folium.plugins.HeatMap (radius, max_zoom, ...) [type: dict]
+    """
+
+    from folium.plugins import HeatMap
+
+    cells = quadtree_bins(lat, lng, weights, zoom)
+    return HeatMap(name=name, data=cells[['lat', 'lng', 'weight']].values.tolist(), **kwargs)
+
+
+# [Heatmap] folium layer of one circle per cell, sized by the number of points it holds
+def binned_markers(lat, lng, weights=None, zoom=6, name='Orders', color='darkslateblue', max_radius=20):
+    """
+    Args:
+    ----------
+    lat: latitude of the points [type: np.array or pd.Series]
+    lng: longitude of the points [type: np.array or pd.Series]
+    weights: weight of each point [type: np.array, default: 1 per point]
+    zoom: zoom level of the cells [type: int, default: 6]
+    name: name of the layer [type: string, default: 'Orders']
+    color: circle color [type: string, default: 'darkslateblue']
+    max_radius: radius, in pixels, of the heaviest cell [type: float, default: 20]
+    """
+
+    import folium
+
+    cells = quadtree_bins(lat, lng, weights, zoom)
+    radius = max_radius * np.sqrt(cells['weight'] / cells['weight'].max()) if len(cells) else []
+    layer = folium.FeatureGroup(name=name)
+    for (cell_lat, cell_lng, weight), r in zip(cells.values, radius):
+        folium.CircleMarker(location=[cell_lat, cell_lng], radius=max(r, 2), weight=0, fill=True,
+                            fill_color=color, fill_opacity=0.6, tooltip=f'{int(weight)}').add_to(layer)
+    return layer
+
+
+"""
+--------------------------------------------
+---- 4. TIME-BUCKETED SPATIAL AGGREGATION --
+--------------------------------------------
+"""
+
+# [Heatmap] Weighted points of every epoch from one grouped pass over (epoch, lat-bin, lng-bin)
+def epoch_bins(epochs, lat, lng, weights=None, zoom=8, top_k=None):
+    """
+    Args:
+    ----------
+    epochs: time bucket of each point (e.g. order_purchase_yyyymm) [type: np.array or pd.Series]
+    lat: latitude of the points [type: np.array or pd.Series]
+    lng: longitude of the points [type: np.array or pd.Series]
+    weights: weight of each point [type: np.array, default: 1 per point]
+    zoom: zoom level of the cells (see zoom_cell_size); None groups the exact coordinates [type: int, default: 8]
+    top_k: maximum number of cells kept per epoch, heaviest first [type: int, default: None]
+
+    Returns:
+    ----------
+    epoch_keys: sorted distinct epochs [type: np.array]
+    offsets: points of epoch_keys[i] are points[offsets[i]:offsets[i + 1]] [type: np.array]
+    points: (lat, lng, weight) rows, sorted by epoch and then by decreasing weight [type: np.array]
+    """
+
+    epochs = np.asarray(epochs)
+    lat = np.asarray(lat, dtype='float64')
+    lng = np.asarray(lng, dtype='float64')
+    weights = np.ones(len(lat)) if weights is None else np.asarray(weights, dtype='float64')
+    valid = np.isfinite(lat) & np.isfinite(lng) & np.isfinite(weights)
+    epochs, lat, lng, weights = epochs[valid], lat[valid], lng[valid], weights[valid]
+
+    epoch_keys, epoch_codes = np.unique(epochs, return_inverse=True)
+    if zoom is None:
+        _, cells = np.unique(np.column_stack([lat, lng]), axis=0, return_inverse=True)
+        cells = cells.ravel().astype('int64')
+    else:
+        cell_size = zoom_cell_size(zoom)
+        n_cols = 2 ** zoom * BINS_PER_TILE
+        cells = ((lat + 90) // cell_size).astype('int64') * n_cols + ((lng + 180) // cell_size).astype('int64')
+
+    # A single grouping key for (epoch, cell): the grouped pass replaces one scan per epoch
+    _, cells = np.unique(cells, return_inverse=True)
+    n_cells = int(cells.max()) + 1 if len(cells) else 1
+    groups, inverse = np.unique(epoch_codes.astype('int64') * n_cells + cells, return_inverse=True)
+    weight = np.bincount(inverse, weights=weights)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        group_lat = np.bincount(inverse, weights=lat * weights) / weight
+        group_lng = np.bincount(inverse, weights=lng * weights) / weight
+    group_epoch = groups // n_cells
+
+    # Heaviest cells first inside each epoch, then the optional top-k cap from the rank within the epoch
+    order = np.lexsort((-weight, group_epoch))
+    group_epoch = group_epoch[order]
+    starts = np.searchsorted(group_epoch, np.arange(len(epoch_keys)))
+    if top_k is not None:
+        rank = np.arange(len(order)) - starts[group_epoch]
+        order, group_epoch = order[rank < top_k], group_epoch[rank < top_k]
+
+    points = np.column_stack([group_lat[order], group_lng[order], weight[order]])
+    offsets = np.searchsorted(group_epoch, np.arange(len(epoch_keys) + 1))
+    return epoch_keys, offsets, points
+
+
+# [Heatmap] HeatMapWithTime data (one list of [lat, lng, weight] per epoch) from epoch_bins output
+def epoch_heatmap_data(epoch_keys, offsets, points):
+    """
+    Args:
+    ----------
+    epoch_keys, offsets, points: output of epoch_bins [type: np.array]
+    """
+
+    return [points[offsets[i]:offsets[i + 1]].tolist() for i in range(len(epoch_keys))]
+
+
+"""
+--------------------------------------------
+------ 5. OFFLINE STATE -> REGION LOOKUP ---
+--------------------------------------------
+"""
+
+IBGE_STATES_URL = 'https://servicodados.ibge.gov.br/api/v1/localidades/estados'
+
+# The five IBGE macro-regions are fixed, so the state -> region table ships with the code
+STATE_REGIONS = {
+    'Norte': ['AC', 'AP', 'AM', 'PA', 'RO', 'RR', 'TO'],
+    'Nordeste': ['AL', 'BA', 'CE', 'MA', 'PB', 'PE', 'PI', 'RN', 'SE'],
+    'Centro-Oeste': ['DF', 'GO', 'MT', 'MS'],
+    'Sudeste': ['ES', 'MG', 'RJ', 'SP'],
+    'Sul': ['PR', 'RS', 'SC'],
+}
+
+
+# [Regions] Bundled state table (sigla, nome, nome_regiao) built from data/BRA_adm1.csv
+def bundled_br_info(path='data/'):
+    """
+    Args:
+    ----------
+    path: directory holding BRA_adm1.csv [type: string, default: 'data/']
+    """
+
+    adm1 = pd.read_csv(os.path.join(path, 'BRA_adm1.csv'), usecols=['NAME_1', 'HASC_1'])
+    region_of = {state: region for region, states in STATE_REGIONS.items() for state in states}
+    br_info = pd.DataFrame({'sigla': adm1['HASC_1'].str.replace('BR.', '', regex=False), 'nome': adm1['NAME_1']})
+    br_info['nome_regiao'] = br_info['sigla'].map(region_of)
+    return br_info.sort_values(by='sigla').reset_index(drop=True)
+
+
+# [Regions] Refreshes the state table from the IBGE API and caches it as a CSV
+def fetch_br_info(cache_file, url=IBGE_STATES_URL, timeout=10):
+    """
+    Args:
+    ----------
+    cache_file: CSV file where the downloaded table is stored [type: string]
+    url: IBGE localidades endpoint listing the states [type: string, default: IBGE_STATES_URL]
+    timeout: request timeout, in seconds [type: int, default: 10]
+    """
+
+    import requests
+
+    response = requests.get(url, timeout=timeout)
+    response.raise_for_status()
+    states = response.json()
+    br_info = pd.DataFrame({
+        'sigla': [state['sigla'] for state in states],
+        'nome': [state['nome'] for state in states],
+        'nome_regiao': [state['regiao']['nome'] for state in states],
+    })
+    br_info = br_info.drop_duplicates().sort_values(by='sigla').reset_index(drop=True)
+    os.makedirs(os.path.dirname(cache_file) or '.', exist_ok=True)
+    br_info.to_csv(cache_file, index=False)
+    return br_info
+
+
+# [Regions] State table from the local cache, or the bundled one; the network is only used when refresh=True
+def load_br_info(path='data/', refresh=False, cache_file=None):
+    """
+    Args:
+    ----------
+    path: directory holding BRA_adm1.csv [type: string, default: 'data/']
+    refresh: download the table from IBGE and update the cache [type: bool, default: False]
+    cache_file: CSV cache of the IBGE table [type: string, default: path + 'cache/br_info.csv']
+    """
+
+    cache_file = cache_file if cache_file is not None else os.path.join(path, 'cache', 'br_info.csv')
+    if refresh:
+        return fetch_br_info(cache_file)
+    if os.path.exists(cache_file):
+        return pd.read_csv(cache_file)
+    return bundled_br_info(path)
+
+
+# [Regions] Region of each state as a categorical, mapping the (few) state categories instead of every row
+def state_regions(states, br_info):
+    """
+    Args:
+    ----------
+    states: state abbreviations (e.g. customer_state) [type: pd.Series]
+    br_info: state table with sigla and nome_regiao columns [type: pd.DataFrame]
+    """
+
+    states = pd.Categorical(states)
+    regions = pd.Index(br_info['nome_regiao'].unique())
+    category_regions = regions.get_indexer(
+        br_info.set_index('sigla')['nome_regiao'].reindex(states.categories).values)
+    # Missing states (code -1) pick the trailing -1, i.e. a missing region
+    codes = np.append(category_regions, -1)[states.codes]
+    return pd.Categorical.from_codes(codes, regions)
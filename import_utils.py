@@ -0,0 +1,31 @@
+import sys
+import importlib
+from types import ModuleType
+
+"""
+--------------------------------------------
+------------ 1. LAZY MODULE IMPORTS --------
+--------------------------------------------
+"""
+
+# [Import] Module placeholder imported on the first attribute access (e.g. np = lazy_import('numpy'))
+class LazyModule(ModuleType):
+
+    def __getattr__(self, attr):
+        # Only called for attributes missing from the placeholder: imports the module once and copies its
+        # namespace, so the next lookups are plain attribute reads
+        module = importlib.import_module(self.__name__)
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attr)
+
+
+# [Import] Returns a lazily imported module, or the module itself when it is already loaded
+def lazy_import(name):
+    """
+    Args:
+    ----------
+    name: absolute module name, e.g. 'pandas' or 'matplotlib.pyplot' [type: string]
+    """
+
+    module = sys.modules.get(name)
+    return module if module is not None else LazyModule(name)
@@ -0,0 +1,21 @@
+import pandas as pd
+
+from data_utils import load_cached_frame
+
+
+def test_load_cached_frame_rebuilds_when_params_change(tmp_path):
+    source = tmp_path / 'orders.csv'
+    source.write_text('order_id\n1\n2\n')
+    builds = []
+
+    def build():
+        builds.append(1)
+        return pd.DataFrame({'order_id': [1, 2], 'build': len(builds)})
+
+    cache_dir = str(tmp_path / 'cache')
+    first = load_cached_frame('fact', [str(source)], build, cache_dir=cache_dir, params={'version': 1})
+    cached = load_cached_frame('fact', [str(source)], build, cache_dir=cache_dir, params={'version': 1})
+    rebuilt = load_cached_frame('fact', [str(source)], build, cache_dir=cache_dir, params={'version': 2})
+    assert len(builds) == 2
+    assert cached['build'].tolist() == first['build'].tolist() == [1, 1]
+    assert rebuilt['build'].tolist() == [2, 2]
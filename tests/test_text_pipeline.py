@@ -0,0 +1,34 @@
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import CountVectorizer
+
+from text_utils import DEFAULT_REGEX_TRANSFORMERS
+from text_pipeline import ApplyRegex, TextFeatureExtraction, parallel_transform
+
+
+CORPUS = ['Produto chegou em 10/02/2018!! Muito bom :)', 'Não recebi... veja http://site.com.br',
+          'Entrega rápida\nR$ 50,00 bem gasto'] * 20
+
+
+def test_parallel_transform_uses_every_core():
+    serial = ApplyRegex(DEFAULT_REGEX_TRANSFORMERS)
+    assert parallel_transform(serial, CORPUS, n_jobs=-1, chunksize=7) == serial.transform(CORPUS)
+
+
+def test_apply_regex_all_cores_matches_serial():
+    serial = ApplyRegex(DEFAULT_REGEX_TRANSFORMERS).transform(CORPUS)
+    assert ApplyRegex(DEFAULT_REGEX_TRANSFORMERS, n_jobs=-1, chunksize=7).transform(CORPUS) == serial
+
+
+def test_text_feature_extraction_formats_transform_with_dtype():
+    vectorizer = CountVectorizer().fit(CORPUS)
+    train = TextFeatureExtraction(vectorizer, dtype=np.float32).transform(CORPUS)
+    test = TextFeatureExtraction(vectorizer, train=False, dtype=np.float32).transform(CORPUS)
+    assert isinstance(test, np.ndarray) and test.dtype == np.float32
+    np.testing.assert_array_equal(test, train)
+
+
+def test_text_feature_extraction_keeps_sparse_transform_by_default():
+    vectorizer = CountVectorizer().fit(CORPUS)
+    test = TextFeatureExtraction(vectorizer, train=False).transform(CORPUS)
+    assert sp.issparse(test) and test.format == 'csr'
@@ -0,0 +1,24 @@
+import pytest
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.svm import LinearSVC
+
+from text_utils import save_sentiment_bundle
+
+
+TEXTS = ['produto otimo chegou rapido', 'pessimo nao recebi', 'adorei otimo', 'ruim demorou pessimo']
+LABELS = [1, 0, 1, 0]
+
+
+def test_save_sentiment_bundle_rejects_models_without_logistic_link(tmp_path):
+    vectorizer = CountVectorizer().fit(TEXTS)
+    model = LinearSVC().fit(vectorizer.transform(TEXTS), LABELS)
+    with pytest.raises(ValueError):
+        save_sentiment_bundle(str(tmp_path), vectorizer, model, text_stopwords=None)
+
+
+def test_save_sentiment_bundle_accepts_logistic_regression(tmp_path):
+    vectorizer = CountVectorizer().fit(TEXTS)
+    model = LogisticRegression().fit(vectorizer.transform(TEXTS), LABELS)
+    save_sentiment_bundle(str(tmp_path), vectorizer, model, text_stopwords=None)
+    assert (tmp_path / 'coef.npy').exists()
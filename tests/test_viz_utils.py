@@ -0,0 +1,75 @@
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import pytest
+
+from viz_utils import binned_kde, boxenplot, contingency_tables, distplot, grid_plot, grouped_histogram, \
+    single_countplot, stripplot
+
+
+def test_contingency_tables_follow_in_place_edits():
+    df = pd.DataFrame({'state': ['sp', 'rj', 'sp', 'mg'], 'target': ['x', 'y', 'y', 'x']})
+    contingency_tables(df, ['state'], 'target')
+    df['state'] = ['mg', 'mg', 'rj', 'rj']
+    table = contingency_tables(df, ['state'], 'target')['state']
+    pd.testing.assert_frame_equal(table, pd.crosstab(df['state'], df['target']), check_dtype=False)
+
+
+def test_contingency_tables_cache_by_explicit_version():
+    df = pd.DataFrame({'state': ['sp', 'rj', 'sp', 'mg'], 'target': ['x', 'y', 'y', 'x']})
+    first = contingency_tables(df, ['state'], 'target', version=1)['state']
+    assert contingency_tables(df, ['state'], 'target', version=1)['state'] is first
+    df['state'] = ['mg', 'mg', 'rj', 'rj']
+    table = contingency_tables(df, ['state'], 'target', version=2)['state']
+    pd.testing.assert_frame_equal(table, pd.crosstab(df['state'], df['target']), check_dtype=False)
+
+
+def test_binned_kde_and_histogram_handle_empty_groups():
+    values, codes = np.array([]), np.array([], dtype=np.int64)
+    grid, density = binned_kde(values, codes, 2, gridsize=64)
+    edges, counts = grouped_histogram(values, codes, 2, bins=10)
+    assert grid.shape == (64,) and not density.any()
+    assert edges.shape == (11,) and not counts.any()
+
+    # Um grupo vazio ao lado de um grupo com valores
+    grid, density = binned_kde(np.array([1., 2., 3.]), np.array([0, 0, 0]), 2, gridsize=64)
+    assert density[0].sum() > 0 and not density[1].any()
+
+
+def test_density_plots_skip_all_nan_features():
+    df = pd.DataFrame({'price': [1., 2., np.nan, 4.], 'empty': np.nan, 'target': ['x', 'y', 'x', 'x']})
+    for plot in (distplot, stripplot, boxenplot):
+        plot(df, ['price', 'empty'], 2, hue='target')
+        plt.close('all')
+
+
+def test_grid_plot_exports_drawn_panels_once(tmp_path):
+    calls = []
+
+    def panel(ax, value):
+        calls.append(value)
+        ax.plot([0, value])
+
+    grid_plot(panel, [(1,), (2,), (3,)], 2, (8, 6), export_dir=str(tmp_path), export_format='svg')
+    plt.close('all')
+    assert calls == [1, 2, 3]
+    assert sorted(f.name for f in tmp_path.iterdir()) == ['panel.png', 'panel_00.svg', 'panel_01.svg', 'panel_02.svg']
+
+
+def test_single_countplot_hue_from_precomputed_table():
+    df = pd.DataFrame({'state': ['sp', 'rj', 'sp', 'mg', 'sp'], 'year': [2017, 2018, 2018, 2017, 2017]})
+    table = contingency_tables(df, ['state'], 'year')['state']
+    fig, ax = plt.subplots()
+    single_countplot(None, ax, x='state', hue='year', table=table)
+    labels = sorted(text.get_text() for text in ax.texts)
+    plt.close('all')
+    assert labels == ['1\n20.0%', '1\n20.0%', '1\n20.0%', '2\n40.0%']
+
+
+def test_single_countplot_hue_without_data_raises():
+    fig, ax = plt.subplots()
+    with pytest.raises(ValueError):
+        single_countplot(None, ax, x='state', hue='year', counts=pd.Series({'sp': 3}))
+    plt.close('all')
@@ -0,0 +1,254 @@
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+from sklearn.base import BaseEstimator, TransformerMixin, clone
+from text_utils import REGEX_STEPS, TextNormalizer, stopwords_set, stopwords_removal, stemming_process, \
+    stopwords_stemming, format_features
+
+"""
+--------------------------------------------
+-------- 1. PIPELINE DE DATA PREP ----------
+--------------------------------------------
+"""
+
+# [TEXT PREP] Transformador de cada processo do pool, configurado uma única vez na inicialização do worker
+_worker_transformer = None
+
+
+def _init_worker(transformer):
+    global _worker_transformer
+    _worker_transformer = transformer
+
+
+def _transform_chunk(chunk):
+    return _worker_transformer.transform(chunk)
+
+
+# [TEXT PREP] Função para aplicar um transformador por documento em paralelo, dividindo o corpus em blocos
+def parallel_transform(transformer, X, n_jobs=-1, chunksize=1000):
+    """
+    Args:
+    ----------
+    transformer: per-document transformer, sent once to each worker process [type: object]
+    X: corpus to be transformed [type: list]
+    n_jobs: number of worker processes; -1 uses every core [type: int, default: -1]
+    chunksize: documents per task sent to the workers [type: int, default: 1000]
+
+    Returns:
+    ----------
+    transformed documents, in the same order as X [type: list]
+    """
+
+    X = list(X)
+    n_jobs = os.cpu_count() if n_jobs is None or n_jobs < 0 else n_jobs
+    if n_jobs <= 1 or len(X) <= chunksize:
+        return transformer.transform(X)
+
+    chunks = [X[i:i + chunksize] for i in range(0, len(X), chunksize)]
+    with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=(transformer,)) as executor:
+        return [doc for chunk in executor.map(_transform_chunk, chunks) for doc in chunk]
+
+
+# [TEXT PREP] Classe para paralelizar qualquer transformador por documento (ex: um Pipeline de preparação de texto)
+class ParallelTransformer(BaseEstimator, TransformerMixin):
+
+    def __init__(self, transformer, n_jobs=-1, chunksize=1000):
+        self.transformer = transformer
+        self.n_jobs = n_jobs
+        self.chunksize = chunksize
+
+    def fit(self, X, y=None):
+        self.transformer.fit(X, y)
+        return self
+
+    def transform(self, X, y=None):
+        return parallel_transform(self.transformer, X, self.n_jobs, self.chunksize)
+
+
+# [TEXT PREP] Classe para aplicar uma série de funções RegEx definidas em um dicionário
+class ApplyRegex(BaseEstimator, TransformerMixin):
+
+    def __init__(self, regex_transformers, n_jobs=1, chunksize=1000):
+        self.regex_transformers = regex_transformers
+        self.n_jobs = n_jobs
+        self.chunksize = chunksize
+
+    def fit(self, X, y=None):
+        return self
+
+    def __sklearn_is_fitted__(self):
+        # Transformador sem estado: pode ser usado (inclusive dentro de um Pipeline) sem fit
+        return True
+
+    def transform(self, X, y=None):
+        if self.n_jobs != 1:
+            return parallel_transform(clone(self).set_params(n_jobs=1), X, self.n_jobs, self.chunksize)
+
+        # Funções re_* conhecidas são fundidas em uma única passada pelo corpus, com padrões pré-compilados
+        regex_functions = list(self.regex_transformers.values())
+        if all(regex_function in REGEX_STEPS for regex_function in regex_functions):
+            return TextNormalizer(regex_functions).transform(X)
+
+        # Applying all regex functions in the regex_transformers dictionary
+        for regex_name, regex_function in self.regex_transformers.items():
+            X = regex_function(X)
+
+        return X
+
+
+# [TEXT PREP] Classe para aplicar a remoção de stopwords em um corpus
+class StopWordsRemoval(BaseEstimator, TransformerMixin):
+
+    def __init__(self, text_stopwords, n_jobs=1, chunksize=1000):
+        self.text_stopwords = text_stopwords
+        self.n_jobs = n_jobs
+        self.chunksize = chunksize
+
+    def fit(self, X, y=None):
+        return self
+
+    def __sklearn_is_fitted__(self):
+        # Transformador sem estado: pode ser usado (inclusive dentro de um Pipeline) sem fit
+        return True
+
+    def transform(self, X, y=None):
+        if self.n_jobs != 1:
+            return parallel_transform(clone(self).set_params(n_jobs=1), X, self.n_jobs, self.chunksize)
+        text_stopwords = stopwords_set(self.text_stopwords)
+        return [' '.join(stopwords_removal(comment, text_stopwords)) for comment in X]
+
+
+# [TEXT PREP] Classe para aplicar o processo de stemming em um corpus
+class StemmingProcess(BaseEstimator, TransformerMixin):
+
+    def __init__(self, stemmer, n_jobs=1, chunksize=1000):
+        self.stemmer = stemmer
+        self.n_jobs = n_jobs
+        self.chunksize = chunksize
+
+    def fit(self, X, y=None):
+        return self
+
+    def __sklearn_is_fitted__(self):
+        # Transformador sem estado: pode ser usado (inclusive dentro de um Pipeline) sem fit
+        return True
+
+    def transform(self, X, y=None):
+        if self.n_jobs != 1:
+            return parallel_transform(clone(self).set_params(n_jobs=1), X, self.n_jobs, self.chunksize)
+        return [' '.join(stemming_process(comment, self.stemmer)) for comment in X]
+
+
+# [TEXT PREP] Classe que une StopWordsRemoval e StemmingProcess em uma única passagem pelos tokens
+class StopWordsStemming(BaseEstimator, TransformerMixin):
+
+    def __init__(self, text_stopwords, stemmer, n_jobs=1, chunksize=1000):
+        self.text_stopwords = text_stopwords
+        self.stemmer = stemmer
+        self.n_jobs = n_jobs
+        self.chunksize = chunksize
+
+    def fit(self, X, y=None):
+        return self
+
+    def __sklearn_is_fitted__(self):
+        # Transformador sem estado: pode ser usado (inclusive dentro de um Pipeline) sem fit
+        return True
+
+    def transform(self, X, y=None):
+        if self.n_jobs != 1:
+            return parallel_transform(clone(self).set_params(n_jobs=1), X, self.n_jobs, self.chunksize)
+        text_stopwords = stopwords_set(self.text_stopwords)
+        return [' '.join(stopwords_stemming(comment, text_stopwords, self.stemmer)) for comment in X]
+
+
+# [TEXT PREP] Classe para extração de features de um corpus (vocabulário / bag of words / TF-IDF)
+class TextFeatureExtraction(BaseEstimator, TransformerMixin):
+
+    def __init__(self, vectorizer, train=True, sparse=False, dtype=None):
+        self.vectorizer = vectorizer
+        self.train = train
+        self.sparse = sparse
+        self.dtype = dtype
+
+    def fit(self, X, y=None):
+        return self
+
+    def transform(self, X, y=None):
+        # Modo esparso: CSR nos dois casos (treino e transformação), sem materializar a matriz densa
+        if self.train:
+            return format_features(self.vectorizer.fit_transform(X), self.sparse, self.dtype)
+        elif self.sparse or self.dtype is not None:
+            return format_features(self.vectorizer.transform(X), self.sparse, self.dtype)
+        else:
+            # Sem sparse/dtype, mantém o retorno original da transformação: a matriz CSR do vetorizador
+            return self.vectorizer.transform(X)
+
+
+# [TEXT PREP] Extração de features por hashing: dimensão fixa, sem vocabulário e treinável em mini-batches
+class HashingFeatureExtraction(BaseEstimator, TransformerMixin):
+    """
+    Stateless hashing of the tokens into n_features columns, optionally reweighted by TF-IDF. The document
+    frequencies are updated incrementally with partial_fit, so a stream of reviews can be vectorized (and a model
+    trained with partial_fit) in mini-batches with bounded memory.
+
+    Args:
+    ----------
+    n_features: number of columns (hash buckets) of the output matrix [type: int, default: 2**20]
+    ngram_range: lower and upper bound of the n-grams to be hashed [type: tuple, default: (1, 1)]
+    stop_words: stopwords removed by the tokenizer [type: list, default: None]
+    use_idf: reweights the term frequencies by the smoothed inverse document frequency [type: bool, default: True]
+    norm: row normalization ('l1', 'l2' or None) [type: string, default: 'l2']
+    dtype: output dtype [type: dtype, default: np.float32]
+    """
+
+    def __init__(self, n_features=2 ** 20, ngram_range=(1, 1), stop_words=None, use_idf=True, norm='l2',
+                 dtype=np.float32):
+        self.n_features = n_features
+        self.ngram_range = ngram_range
+        self.stop_words = stop_words
+        self.use_idf = use_idf
+        self.norm = norm
+        self.dtype = dtype
+
+    def _hashed_counts(self, X):
+        vectorizer = HashingVectorizer(n_features=self.n_features, ngram_range=self.ngram_range,
+                                       stop_words=self.stop_words, alternate_sign=False, norm=None,
+                                       dtype=self.dtype)
+        return vectorizer.transform(X)
+
+    def fit(self, X, y=None):
+        for attr in ('n_docs_', 'document_frequency_'):
+            self.__dict__.pop(attr, None)
+        return self.partial_fit(X, y)
+
+    def partial_fit(self, X, y=None):
+        if not self.use_idf:
+            self.n_docs_ = getattr(self, 'n_docs_', 0) + len(X)
+            return self
+
+        # Frequência de documentos: número de linhas com valor não nulo em cada coluna
+        counts = self._hashed_counts(X).tocsc()
+        if not hasattr(self, 'document_frequency_'):
+            self.n_docs_ = 0
+            self.document_frequency_ = np.zeros(self.n_features, dtype=np.int64)
+        self.document_frequency_ += np.diff(counts.indptr)
+        self.n_docs_ += counts.shape[0]
+        return self
+
+    def idf(self):
+        # Mesma suavização do TfidfTransformer (smooth_idf=True)
+        return np.log((1 + self.n_docs_) / (1 + self.document_frequency_)) + 1
+
+    def transform(self, X, y=None):
+        features = self._hashed_counts(X)
+        if self.use_idf:
+            if not hasattr(self, 'document_frequency_'):
+                raise ValueError('HashingFeatureExtraction with use_idf=True must be fitted (fit or partial_fit) '
+                                 'before transform')
+            features = features.multiply(self.idf().astype(self.dtype)).tocsr()
+        if self.norm is not None:
+            features = normalize(features, norm=self.norm, copy=False)
+        return features.astype(self.dtype, copy=False)
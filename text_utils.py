@@ -1,8 +1,42 @@
+import os
 import re
-from nltk.corpus import stopwords
-from nltk.stem import RSLPStemmer
-from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
-from sklearn.base import BaseEstimator, TransformerMixin
+import json
+import time
+import importlib
+from collections import OrderedDict
+from functools import cached_property, lru_cache
+from import_utils import lazy_import
+
+# Dependências pesadas carregadas no primeiro uso: os limpadores de texto (regex) importam sem numpy, pandas,
+# NLTK ou sklearn; os transformadores do sklearn ficam em text_pipeline.py
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+# Nomes importados sob demanda via __getattr__ do módulo (mantém `from text_utils import ApplyRegex` funcionando)
+LAZY_ATTRIBUTES = {
+    'stopwords': 'nltk.corpus',
+    'RSLPStemmer': 'nltk.stem',
+    'CountVectorizer': 'sklearn.feature_extraction.text',
+    'TfidfVectorizer': 'sklearn.feature_extraction.text',
+    'HashingVectorizer': 'sklearn.feature_extraction.text',
+    'parallel_transform': 'text_pipeline',
+    'ParallelTransformer': 'text_pipeline',
+    'ApplyRegex': 'text_pipeline',
+    'StopWordsRemoval': 'text_pipeline',
+    'StemmingProcess': 'text_pipeline',
+    'StopWordsStemming': 'text_pipeline',
+    'TextFeatureExtraction': 'text_pipeline',
+    'HashingFeatureExtraction': 'text_pipeline',
+}
+
+
+def __getattr__(name):
+    if name == 'PORTUGUESE_STOPWORDS':
+        return nltk_stopwords('portuguese')
+    if name in LAZY_ATTRIBUTES:
+        return getattr(importlib.import_module(LAZY_ATTRIBUTES[name]), name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
 
 """
 --------------------------------------------
@@ -10,6 +44,17 @@ from sklearn.base import BaseEstimator, TransformerMixin
 --------------------------------------------
 """
 
+# [RegEx] Padrões compilados uma única vez, no carregamento do módulo
+RE_BREAKLINE = re.compile('[\n\r]')
+RE_HIPERLINKS = re.compile(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\(\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+')
+RE_DATES = re.compile(r'([0-2][0-9]|(3)[0-1])(\/|\.)(((0)[0-9])|((1)[0-2]))(\/|\.)\d{2,4}')
+RE_MONEY = re.compile(r'[R]{0,1}\$[ ]{0,}\d+(,|\.)\d+')
+RE_NUMBERS = re.compile('[0-9]+')
+RE_NEGATION = re.compile('([nN][ãÃaA][oO]|[ñÑ]| [nN] )')
+RE_SPECIAL_CHARS = re.compile(r'\W')
+RE_WHITESPACES = re.compile(r'\s+')
+RE_TRAILING_SPACES = re.compile('[ \t]+$')
+
 # [RegEx] Padrão para encontrar quebra de linha e retorno de carro (\n ou \r)
 def re_breakline(text_list, text_sub=' '):
     """
@@ -19,7 +64,7 @@ def re_breakline(text_list, text_sub=' '):
     text_sub: string or pattern to substitute the regex pattern [type: string]
     """
 
-    return [re.sub('[\n\r]', text_sub, r) for r in text_list]
+    return [RE_BREAKLINE.sub(text_sub, r) for r in text_list]
 
 
 # [RegEx] Padrão para encontrar sites ou hiperlinks
@@ -31,8 +76,7 @@ def re_hiperlinks(text_list, text_sub=' link '):
     text_sub: string or pattern to substitute the regex pattern [type: string]
     """
 
-    pattern = 'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\(\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+'
-    return [re.sub(pattern, text_sub, r) for r in text_list]
+    return [RE_HIPERLINKS.sub(text_sub, r) for r in text_list]
 
 
 # [RegEx] Padrão para encontrar datas nos mais diversos formatos (dd/mm/yyyy, dd/mm/yy, dd.mm.yyyy, dd.mm.yy)
@@ -44,8 +88,7 @@ def re_dates(text_list, text_sub=' data '):
     text_sub: string or pattern to substitute the regex pattern [type: string]
     """
 
-    pattern = '([0-2][0-9]|(3)[0-1])(\/|\.)(((0)[0-9])|((1)[0-2]))(\/|\.)\d{2,4}'
-    return [re.sub(pattern, text_sub, r) for r in text_list]
+    return [RE_DATES.sub(text_sub, r) for r in text_list]
 
 
 # [RegEx] Padrão para encontrar valores financeiros (R$ ou  $)
@@ -58,8 +101,7 @@ def re_money(text_list, text_sub=' dinheiro '):
     """
 
     # Applying regex
-    pattern = '[R]{0,1}\$[ ]{0,}\d+(,|\.)\d+'
-    return [re.sub(pattern, text_sub, r) for r in text_list]
+    return [RE_MONEY.sub(text_sub, r) for r in text_list]
 
 
 # [RegEx] Padrão para encontrar números
@@ -72,7 +114,7 @@ def re_numbers(text_list, text_sub=' numero '):
     """
 
     # Applying regex
-    return [re.sub('[0-9]+', text_sub, r) for r in text_list]
+    return [RE_NUMBERS.sub(text_sub, r) for r in text_list]
 
 
 # [RegEx] Padrão para encontrar a palavra "não" em seus mais diversos formatos
@@ -85,7 +127,7 @@ def re_negation(text_list, text_sub=' negação '):
     """
 
     # Applying regex
-    return [re.sub('([nN][ãÃaA][oO]|[ñÑ]| [nN] )', text_sub, r) for r in text_list]
+    return [RE_NEGATION.sub(text_sub, r) for r in text_list]
 
 
 # [RegEx] Padrão para limpar caracteres especiais
@@ -98,7 +140,7 @@ def re_special_chars(text_list, text_sub=' '):
     """
 
     # Applying regex
-    return [re.sub('\W', text_sub, r) for r in text_list]
+    return [RE_SPECIAL_CHARS.sub(text_sub, r) for r in text_list]
 
 
 # [RegEx] Padrão para limpar espaços adicionais
@@ -110,9 +152,99 @@ def re_whitespaces(text_list):
     """
 
     # Applying regex
-    white_spaces = [re.sub('\s+', ' ', r) for r in text_list]
-    white_spaces_end = [re.sub('[ \t]+$', '', r) for r in white_spaces]
-    return white_spaces_end
+    return [RE_TRAILING_SPACES.sub('', RE_WHITESPACES.sub(' ', r)) for r in text_list]
+
+
+# [RegEx] Etapa (padrão compilado, substituição, literais exigidos) equivalente a cada função re_* com seus
+# argumentos padrão. Quando nenhum dos literais aparece no documento, a etapa é pulada sem acionar o regex
+REGEX_STEPS = {
+    re_breakline: (RE_BREAKLINE, ' ', ('\n', '\r')),
+    re_hiperlinks: (RE_HIPERLINKS, ' link ', ('http',)),
+    re_dates: (RE_DATES, ' data ', ('/', '.')),
+    re_money: (RE_MONEY, ' dinheiro ', ('$',)),
+    re_numbers: (RE_NUMBERS, ' numero ', None),
+    re_negation: (RE_NEGATION, ' negação ', None),
+    re_special_chars: (RE_SPECIAL_CHARS, ' ', None),
+    re_whitespaces: (RE_WHITESPACES, ' ', None),
+}
+
+# [RegEx] re_special_chars seguido de re_whitespaces equivale a trocar cada sequência de \W por um espaço
+RE_NON_WORD_RUNS = re.compile(r'\W+')
+
+# [RegEx] Cadeia padrão de limpeza aplicada aos comentários
+DEFAULT_REGEX_TRANSFORMERS = {
+    'break_line': re_breakline,
+    'hiperlinks': re_hiperlinks,
+    'dates': re_dates,
+    'money': re_money,
+    'numbers': re_numbers,
+    'negation': re_negation,
+    'special_chars': re_special_chars,
+    'whitespaces': re_whitespaces
+}
+
+
+# [RegEx] Normalizador que aplica todas as substituições a cada documento em uma única passada pelo corpus
+class TextNormalizer:
+
+    def __init__(self, regex_functions=None):
+        """
+        Args:
+        ----------
+        regex_functions: re_* functions to be fused, in order [type: list,
+                         default: DEFAULT_REGEX_TRANSFORMERS.values()]
+        """
+
+        if regex_functions is None:
+            regex_functions = list(DEFAULT_REGEX_TRANSFORMERS.values())
+
+        # Etapas no formato (padrão, substituição, literais, remover espaço final)
+        self.steps = []
+        for function in regex_functions:
+            pattern, text_sub, literals = REGEX_STEPS[function]
+            if function is re_whitespaces:
+                # Após colapsar os espaços não restam quebras de linha: '[ \t]+$' equivale a rstrip(' ')
+                if self.steps and self.steps[-1][0] is RE_SPECIAL_CHARS:
+                    self.steps.pop()
+                    pattern = RE_NON_WORD_RUNS
+                self.steps.append((pattern, text_sub, literals, True))
+            else:
+                self.steps.append((pattern, text_sub, literals, False))
+
+    def normalize(self, text):
+        """
+        Args:
+        ----------
+        text: document to be cleaned [type: string]
+        """
+
+        for pattern, text_sub, literals, strip_end in self.steps:
+            if literals is None or any(literal in text for literal in literals):
+                text = pattern.sub(text_sub, text)
+            if strip_end:
+                text = text.rstrip(' ')
+        return text
+
+    def transform(self, text_list):
+        """
+        Args:
+        ----------
+        text_list: list object with text content to be prepared [type: list]
+        """
+
+        normalize = self.normalize
+        return [normalize(text) for text in text_list]
+
+    def transform_series(self, text_series):
+        """
+        Args:
+        ----------
+        text_series: text column (e.g. review_comment_message); missing values are kept [type: pd.Series]
+        """
+
+        values = text_series.tolist()
+        cleaned = [self.normalize(text) if isinstance(text, str) else text for text in values]
+        return pd.Series(cleaned, index=text_series.index, name=text_series.name)
 
 
 """
@@ -121,16 +253,51 @@ def re_whitespaces(text_list):
 --------------------------------------------
 """
 
+# [StopWords] Stopwords do NLTK em frozenset (pertinência O(1)), carregadas uma única vez por idioma
+@lru_cache(maxsize=None)
+def nltk_stopwords(language='portuguese'):
+    """
+    Args:
+    ----------
+    language: NLTK stopwords corpus language [type: string, default: 'portuguese']
+    """
+
+    from nltk.corpus import stopwords
+
+    return frozenset(stopwords.words(language))
+
+
+# [StopWords] Garante um conjunto de stopwords (listas são convertidas uma única vez por chamada)
+def stopwords_set(cached_stopwords):
+    """
+    Args:
+    ----------
+    cached_stopwords: stopwords to be converted; a string is read as an NLTK language and None as no
+                      stopwords [type: list, set, frozenset, string or None]
+    """
+
+    if isinstance(cached_stopwords, (set, frozenset)):
+        return cached_stopwords
+    if isinstance(cached_stopwords, str):
+        return nltk_stopwords(cached_stopwords)
+    if cached_stopwords is None:
+        return frozenset()
+    return frozenset(cached_stopwords)
+
+
 # [StopWords] Função para remoção das stopwords e transformação de texto em minúsculas
-def stopwords_removal(text, cached_stopwords=stopwords.words('portuguese')):
+def stopwords_removal(text, cached_stopwords='portuguese'):
     """
     Args:
     ----------
     text: list object where the stopwords will be removed [type: list]
-    cached_stopwords: stopwords to be applied on the process [type: list, default: stopwords.words('portuguese')]
+    cached_stopwords: stopwords (or NLTK language) to be applied on the process [type: frozenset or string,
+                      default: 'portuguese']
     """
 
-    return [c.lower() for c in text.split() if c.lower() not in cached_stopwords]
+    # O texto é convertido para minúsculas uma única vez, antes da tokenização
+    cached_stopwords = stopwords_set(cached_stopwords)
+    return [c for c in text.lower().split() if c not in cached_stopwords]
 
 
 """
@@ -139,8 +306,16 @@ def stopwords_removal(text, cached_stopwords=stopwords.words('portuguese')):
 --------------------------------------------
 """
 
+# [Stemming] RSLPStemmer compartilhado, criado (e com as regras do NLTK carregadas) apenas no primeiro uso
+@lru_cache(maxsize=None)
+def rslp_stemmer():
+    from nltk.stem import RSLPStemmer
+
+    return RSLPStemmer()
+
+
 # [Stemming] Função para aplicação de processo de stemming nas palavras
-def stemming_process(text, stemmer=RSLPStemmer()):
+def stemming_process(text, stemmer=None):
     """
     Args:
     ----------
@@ -148,31 +323,145 @@ def stemming_process(text, stemmer=RSLPStemmer()):
     stemmer: type of stemmer to be applied [type: class, default: RSLPStemmer()]
     """
 
+    stemmer = stemmer if stemmer is not None else rslp_stemmer()
     return [stemmer.stem(c) for c in text.split()]
 
 
+# [Stemming] Remoção de stopwords e stemming em uma única tokenização (sem o ciclo join -> split entre as etapas)
+def stopwords_stemming(text, cached_stopwords='portuguese', stemmer=None):
+    """
+    Args:
+    ----------
+    text: text where the stopwords will be removed and the tokens stemmed [type: string]
+    cached_stopwords: stopwords (or NLTK language) to be applied on the process [type: frozenset or string,
+                      default: 'portuguese']
+    stemmer: type of stemmer to be applied [type: class, default: RSLPStemmer()]
+    """
+
+    cached_stopwords = stopwords_set(cached_stopwords)
+    stem = (stemmer if stemmer is not None else rslp_stemmer()).stem
+    return [stem(c) for c in text.lower().split() if c not in cached_stopwords]
+
+
+# [Stemming] Cache LRU token -> radical; expõe o mesmo método stem() do stemmer e pode substituí-lo diretamente
+class StemCache:
+    """
+    Bounded token -> stem memo in front of a stemmer. Reviews follow a Zipfian distribution, so most tokens
+    are answered by a dictionary lookup instead of a pass over the RSLP rules.
+
+    Args:
+    ----------
+    stemmer: stemmer whose results are cached [type: class, default: RSLPStemmer()]
+    maxsize: maximum number of cached tokens; the least recently used are evicted [type: int, default: 100000]
+    """
+
+    def __init__(self, stemmer=None, maxsize=100000):
+        self.stemmer = stemmer
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._stems = OrderedDict()
+
+    def stem(self, token):
+        try:
+            stem = self._stems[token]
+        except KeyError:
+            self.misses += 1
+            # As regras do RSLP só são carregadas na primeira ausência do cache
+            if self.stemmer is None:
+                self.stemmer = rslp_stemmer()
+            stem = self._stems[token] = self.stemmer.stem(token)
+            if len(self._stems) > self.maxsize:
+                self._stems.popitem(last=False)
+            return stem
+
+        self.hits += 1
+        self._stems.move_to_end(token)
+        return stem
+
+    def __len__(self):
+        return len(self._stems)
+
+    def info(self):
+        # Estatísticas no mesmo formato de functools.lru_cache().cache_info()
+        return {'hits': self.hits, 'misses': self.misses, 'maxsize': self.maxsize, 'currsize': len(self._stems)}
+
+    def clear(self):
+        self._stems.clear()
+        self.hits = self.misses = 0
+
+    def save(self, filename):
+        # Tokens gravados do menos para o mais recente, preservando a ordem LRU na recarga
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(list(self._stems.items()), f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, filename, stemmer=None, maxsize=100000):
+        cache = cls(stemmer, maxsize)
+        if os.path.exists(filename):
+            with open(filename, encoding='utf-8') as f:
+                for token, stem in json.load(f)[-maxsize:]:
+                    cache._stems[token] = stem
+        return cache
+
+
 """
 --------------------------------------------
 --- 4. EXTRAÇÃO DE FEATURES DE UM CORPUS ---
 --------------------------------------------
 """
 
+# [Vocabulary] Nomes das features do vetorizador (get_feature_names foi substituído por get_feature_names_out)
+def vectorizer_feature_names(vectorizer):
+    """
+    Args
+    ------------
+    vectorizer: fitted vectorizer [type: object]
+    """
+
+    if hasattr(vectorizer, 'get_feature_names_out'):
+        return vectorizer.get_feature_names_out()
+    return vectorizer.get_feature_names()
+
+
+# [Vocabulary] Converte a matriz documento-termo para CSR (modo esparso) ou array denso, no dtype informado
+def format_features(features, sparse=False, dtype=None):
+    """
+    Args
+    ------------
+    features: document-term matrix returned by the vectorizer [type: scipy.sparse matrix]
+    sparse: keeps the matrix in CSR format instead of a dense array [type: bool, default: False]
+    dtype: output dtype, e.g. np.float32; None keeps the vectorizer dtype [type: dtype, default: None]
+    """
+
+    if sparse:
+        features = features.tocsr()
+        return features.astype(dtype, copy=False) if dtype is not None else features
+
+    return features.toarray() if dtype is None else features.toarray().astype(dtype, copy=False)
+
+
 # [Vocabulary] Função para aplicação de um vetorizador para criação de vocabulário
-def extract_features_from_corpus(corpus, vectorizer, df=False):
+def extract_features_from_corpus(corpus, vectorizer, df=False, sparse=False, dtype=None):
     """
     Args
     ------------
     text: text to be transformed into a document-term matrix [type: string]
     vectorizer: engine to be used in the transformation [type: object]
+    df: also returns the features as a DataFrame (a sparse one if sparse=True) [type: bool, default: False]
+    sparse: keeps the document-term matrix in CSR format [type: bool, default: False]
+    dtype: output dtype, e.g. np.float32 [type: dtype, default: None]
     """
 
     # Extracting features
-    corpus_features = vectorizer.fit_transform(corpus).toarray()
-    features_names = vectorizer.get_feature_names()
+    corpus_features = format_features(vectorizer.fit_transform(corpus), sparse, dtype)
+    features_names = vectorizer_feature_names(vectorizer)
 
     # Transforming into a dataframe to give interpetability to the process
     df_corpus_features = None
-    if df:
+    if df and sparse:
+        df_corpus_features = pd.DataFrame.sparse.from_spmatrix(corpus_features, columns=features_names)
+    elif df:
         df_corpus_features = pd.DataFrame(corpus_features, columns=features_names)
 
     return corpus_features, df_corpus_features
@@ -184,133 +473,446 @@ def extract_features_from_corpus(corpus, vectorizer, df=False):
 --------------------------------------------
 """
 
-# [Viz] Função para retorno de DataFrame de contagem por ngram
-def ngrams_count(corpus, ngram_range, n=-1, cached_stopwords=stopwords.words('portuguese')):
+# [Viz] Seleção dos n maiores valores com argpartition, sem ordenar o vocabulário inteiro
+def top_counts(counts, n=-1):
     """
     Args
     ----------
-    corpus: text to be analysed [type: pd.DataFrame]
-    ngram_range: type of n gram to be used on analysis [type: tuple]
-    n: top limit of ngrams to be shown [type: int, default: -1]
+    counts: counts in vocabulary order [type: np.array]
+    n: top limit, with the same slicing semantics as sorted_list[:n] [type: int, default: -1]
     """
 
-    # Using CountVectorizer to build a bag of words using the given corpus
-    vectorizer = CountVectorizer(stop_words=cached_stopwords, ngram_range=ngram_range).fit(corpus)
-    bag_of_words = vectorizer.transform(corpus)
-    sum_words = bag_of_words.sum(axis=0)
-    words_freq = [(word, sum_words[0, idx]) for word, idx in vectorizer.vocabulary_.items()]
-    words_freq = sorted(words_freq, key=lambda x: x[1], reverse=True)
-    total_list = words_freq[:n]
+    k = len(range(*slice(None, n).indices(len(counts))))
+    if k == 0:
+        return np.array([], dtype=np.int64)
 
-    # Returning a DataFrame with the ngrams count
-    count_df = pd.DataFrame(total_list, columns=['ngram', 'count'])
-    return count_df
+    # Candidatos: todos os valores >= k-ésimo maior; empates mantêm a ordem do vocabulário (ordenação estável)
+    if k < len(counts):
+        threshold = counts[np.argpartition(counts, len(counts) - k)[len(counts) - k]]
+        candidates = np.flatnonzero(counts >= threshold)
+    else:
+        candidates = np.arange(len(counts))
+    order = np.argsort(-counts[candidates], kind='stable')
+    return candidates[order[:k]]
 
 
-"""
---------------------------------------------
--------- 6. PIPELINE DE DATA PREP ----------
---------------------------------------------
-"""
+# [Viz] Contagem de ngrams por blocos do corpus; com capacity, mantém apenas os heavy hitters (Misra-Gries)
+def streamed_ngrams_count(chunks, vectorizer, capacity=None):
+    """
+    Args
+    ----------
+    chunks: iterable of lists of documents [type: iterable]
+    vectorizer: CountVectorizer applied to each chunk [type: object]
+    capacity: maximum number of ngrams kept between chunks; None keeps all of them (exact counts).
+              With a capacity, counts are lower bounds whose error is at most total_count / (capacity + 1)
+              [type: int, default: None]
+    """
 
-# [TEXT PREP] Classe para aplicar uma série de funções RegEx definidas em um dicionário
-class ApplyRegex(BaseEstimator, TransformerMixin):
+    ngram_counts = {}
+    for chunk in chunks:
+        bag_of_words = vectorizer.fit_transform(chunk)
+        sum_words = np.asarray(bag_of_words.sum(axis=0)).ravel()
+        for word, idx in vectorizer.vocabulary_.items():
+            ngram_counts[word] = ngram_counts.get(word, 0) + sum_words[idx]
 
-    def __init__(self, regex_transformers):
-        self.regex_transformers = regex_transformers
+        # Resumo mergeable: subtrai o (capacity + 1)-ésimo maior valor e descarta os contadores não positivos
+        if capacity is not None and len(ngram_counts) > capacity:
+            values = np.fromiter(ngram_counts.values(), dtype=np.int64, count=len(ngram_counts))
+            cut = np.partition(values, len(values) - capacity - 1)[len(values) - capacity - 1]
+            ngram_counts = {word: count - cut for word, count in ngram_counts.items() if count > cut}
 
-    def fit(self, X, y=None):
-        return self
+    return ngram_counts
 
-    def transform(self, X, y=None):
-        # Applying all regex functions in the regex_transformers dictionary
-        for regex_name, regex_function in self.regex_transformers.items():
-            X = regex_function(X)
 
-        return X
+# [Viz] Divide um corpus (lista ou iterável de documentos) em blocos de tamanho fixo
+def iter_corpus_chunks(corpus, chunksize):
+    """
+    Args
+    ----------
+    corpus: documents to be split [type: iterable]
+    chunksize: number of documents per chunk [type: int]
+    """
 
+    chunk = []
+    for doc in corpus:
+        chunk.append(doc)
+        if len(chunk) == chunksize:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
 
-# [TEXT PREP] Classe para aplicar a remoção de stopwords em um corpus
-class StopWordsRemoval(BaseEstimator, TransformerMixin):
 
-    def __init__(self, text_stopwords):
-        self.text_stopwords = text_stopwords
+# [Viz] Função para retorno de DataFrame de contagem por ngram
+def ngrams_count(corpus, ngram_range, n=-1, cached_stopwords='portuguese', chunksize=None, capacity=None):
+    """
+    Args
+    ----------
+    corpus: text to be analysed [type: pd.DataFrame]
+    ngram_range: type of n gram to be used on analysis [type: tuple]
+    n: top limit of ngrams to be shown [type: int, default: -1]
+    cached_stopwords: stopwords (or NLTK language) ignored by the count [type: list or string, default: 'portuguese']
+    chunksize: counts the corpus in chunks of documents instead of a single bag of words [type: int, default: None]
+    capacity: with chunksize, number of heavy hitters kept in memory (approximate counts) [type: int, default: None]
+    """
 
-    def fit(self, X, y=None):
-        return self
+    from sklearn.feature_extraction.text import CountVectorizer
 
-    def transform(self, X, y=None):
-        return [' '.join(stopwords_removal(comment, self.text_stopwords)) for comment in X]
+    # Using CountVectorizer to build a bag of words using the given corpus
+    stop_words = sorted(stopwords_set(cached_stopwords)) or None
+    vectorizer = CountVectorizer(stop_words=stop_words, ngram_range=ngram_range)
+    if chunksize is None:
+        bag_of_words = vectorizer.fit_transform(corpus)
+        sum_words = np.asarray(bag_of_words.sum(axis=0)).ravel()
+        words = list(vectorizer.vocabulary_)
+        counts = sum_words[np.fromiter(vectorizer.vocabulary_.values(), dtype=np.int64, count=len(words))]
+    else:
+        ngram_counts = streamed_ngrams_count(iter_corpus_chunks(corpus, chunksize), vectorizer, capacity)
+        words = list(ngram_counts)
+        counts = np.fromiter(ngram_counts.values(), dtype=np.int64, count=len(words))
 
+    # Returning a DataFrame with the ngrams count
+    top = top_counts(counts, n)
+    count_df = pd.DataFrame([(words[i], counts[i]) for i in top], columns=['ngram', 'count'])
+    return count_df
 
-# [TEXT PREP] Classe para aplicar o processo de stemming em um corpus
-class StemmingProcess(BaseEstimator, TransformerMixin):
 
-    def __init__(self, stemmer):
-        self.stemmer = stemmer
+"""
+--------------------------------------------
+--- 6. UTILITIES FOR SENTIMENT ANALYSIS ----
+--------------------------------------------
+"""
 
-    def fit(self, X, y=None):
-        return self
+# [Sentiment] DataFrame de resultados: rótulo, probabilidade do rótulo e probabilidade de cada classe
+def sentiment_scores_frame(labels, proba, classes):
+    """
+    Args
+    -----------
+    labels: predicted classes [type: np.array]
+    proba: class probabilities, one column per class [type: np.array]
+    classes: classes in the column order of proba [type: np.array]
+    """
 
-    def transform(self, X, y=None):
-        return [' '.join(stemming_process(comment, self.stemmer)) for comment in X]
+    df_scores = pd.DataFrame(proba, columns=[f'proba_{c}' for c in classes])
+    df_scores.insert(0, 'score', proba.max(axis=1))
+    df_scores.insert(0, 'label', labels)
+    return df_scores
 
 
-# [TEXT PREP] Classe para extração de features de um corpus (vocabulário / bag of words / TF-IDF)
-class TextFeatureExtraction(BaseEstimator, TransformerMixin):
+# [Sentiment] Pontuação em lote: prep e vetorizador já treinados, um único predict_proba por lote
+def score_sentiment(texts, pipeline, vectorizer, model, batch_size=10000, as_frame=True):
+    """
+    Args
+    -----------
+    texts: review comments to be scored [type: list, pd.Series or iterable]
+    pipeline: fitted text prep pipeline; None when texts are already prepared [type: sklearn.Pipeline]
+    vectorizer: fitted vectorizer [type: object]
+    model: fitted classifier exposing predict_proba and classes_ [type: model]
+    batch_size: number of texts transformed and scored at a time [type: int, default: 10000]
+    as_frame: returns a DataFrame instead of the (labels, probabilities) arrays [type: bool, default: True]
+    """
 
-    def __init__(self, vectorizer, train=True):
-        self.vectorizer = vectorizer
-        self.train = train
+    if isinstance(texts, str):
+        texts = [texts]
 
-    def fit(self, X, y=None):
-        return self
+    probas = []
+    for batch in iter_corpus_chunks(texts, batch_size):
+        text_prep = pipeline.transform(batch) if pipeline is not None else batch
+        probas.append(model.predict_proba(vectorizer.transform(text_prep)))
 
-    def transform(self, X, y=None):
-        if self.train:
-            return self.vectorizer.fit_transform(X).toarray()
-        else:
-            return self.vectorizer.transform(X)
+    # Rótulos derivados das probabilidades (mesma regra do predict: classe de maior probabilidade)
+    proba = np.concatenate(probas) if probas else np.empty((0, len(model.classes_)))
+    labels = model.classes_[proba.argmax(axis=1)]
+    if not as_frame:
+        return labels, proba
 
+    return sentiment_scores_frame(labels, proba, model.classes_)
 
-"""
---------------------------------------------
---- 7. UTILITIES FOR SENTIMENT ANALYSIS ----
---------------------------------------------
-"""
 
-# Defining a function to plot the sentiment of a given phrase
-def sentiment_analysis(text, pipeline, vectorizer, model):
+# [Sentiment] Plota o sentimento de uma frase a partir do rótulo e da probabilidade já calculados
+def plot_sentiment(label, score, ax=None):
     """
     Args
     -----------
-    text: text string / phrase / review comment to be analysed [type: string]
-    pipeline: text prep pipeline built for preparing the corpus [type: sklearn.Pipeline]
-    model: classification model trained to recognize positive and negative sentiment [type: model]
+    label: predicted class (1 for positive sentiment) [type: int]
+    score: probability of the predicted class [type: float]
+    ax: matplotlib axis where the result will be drawn [type: matplotlib.axis, default: None]
     """
 
-    # Applying the pipeline
-    if type(text) is not list:
-        text = [text]
-    text_prep = pipeline.fit_transform(text)
-    matrix = vectorizer.transform(text_prep)
-
-    # Predicting sentiment
-    pred = model.predict(matrix)
-    proba = model.predict_proba(matrix)
+    import matplotlib.pyplot as plt
 
     # Plotting the sentiment and its score
-    fig, ax = plt.subplots(figsize=(5, 3))
-    if pred[0] == 1:
+    if ax is None:
+        fig, ax = plt.subplots(figsize=(5, 3))
+    if label == 1:
         text = 'Positive'
-        class_proba = 100 * round(proba[0][1], 2)
         color = 'seagreen'
     else:
         text = 'Negative'
-        class_proba = 100 * round(proba[0][0], 2)
         color = 'crimson'
+    class_proba = 100 * round(score, 2)
     ax.text(0.5, 0.5, text, fontsize=50, ha='center', color=color)
     ax.text(0.5, 0.20, str(class_proba) + '%', fontsize=14, ha='center')
     ax.axis('off')
     ax.set_title('Sentiment Analysis', fontsize=14)
-    plt.show()
\ No newline at end of file
+    return ax
+
+
+# Defining a function to plot the sentiment of a given phrase
+def sentiment_analysis(text, pipeline, vectorizer, model):
+    """
+    Args
+    -----------
+    text: text string / phrase / review comment to be analysed [type: string]
+    pipeline: text prep pipeline built for preparing the corpus [type: sklearn.Pipeline]
+    model: classification model trained to recognize positive and negative sentiment [type: model]
+    """
+
+    import matplotlib.pyplot as plt
+
+    # Predicting sentiment and plotting the first phrase
+    labels, proba = score_sentiment(text, pipeline, vectorizer, model, as_frame=False)
+    plot_sentiment(labels[0], proba[0].max())
+    plt.show()
+
+
+"""
+--------------------------------------------
+------ 7. SENTIMENT MODEL BUNDLE -----------
+--------------------------------------------
+"""
+
+# [Bundle] Versão do formato gravado em manifest.json
+BUNDLE_FORMAT_VERSION = 1
+
+
+# [Bundle] Grava vetorizador, modelo linear, stopwords e cache de stemming em um diretório versionado
+def save_sentiment_bundle(directory, vectorizer, model, regex_steps=None, text_stopwords='portuguese',
+                          stem_cache=None):
+    """
+    Args
+    -----------
+    directory: folder where the bundle files will be written [type: string]
+    vectorizer: fitted CountVectorizer or TfidfVectorizer (word analyzer) [type: object]
+    model: fitted binary or multinomial LogisticRegression [type: model]
+    regex_steps: keys of DEFAULT_REGEX_TRANSFORMERS applied before stemming [type: list, default: all of them]
+    text_stopwords: stopwords (or NLTK language) removed before stemming [type: frozenset, default: 'portuguese']
+    stem_cache: warm stem cache to be shipped with the bundle [type: StemCache, default: None]
+    """
+
+    import sklearn
+    from sklearn.linear_model import LogisticRegression
+
+    if getattr(vectorizer, 'analyzer', None) != 'word' or vectorizer.tokenizer is not None \
+            or vectorizer.preprocessor is not None or vectorizer.strip_accents is not None:
+        raise ValueError('Only vectorizers with the default word analyzer, tokenizer and preprocessor are supported')
+
+    # SentimentBundle.predict_proba reproduz o link da LogisticRegression (sigmoide no caso binário, softmax no
+    # multiclasse); outros modelos lineares (LinearSVC, SGDClassifier, one-vs-rest) teriam probabilidades erradas
+    if not isinstance(model, LogisticRegression):
+        raise ValueError(f'Only LogisticRegression models are supported, got {type(model).__name__}')
+    multi_class = getattr(model, 'multi_class', 'auto')
+    if len(model.classes_) > 2 and (multi_class == 'ovr' or (multi_class == 'auto' and model.solver == 'liblinear')):
+        raise ValueError('Only multinomial (softmax) LogisticRegression models are supported for multiclass targets')
+
+    regex_steps = list(DEFAULT_REGEX_TRANSFORMERS) if regex_steps is None else list(regex_steps)
+    os.makedirs(directory, exist_ok=True)
+
+    # Vocabulário em ordem de coluna; o CountVectorizer já atribui as colunas em ordem alfabética,
+    # o que permite buscar os termos com searchsorted direto no array mapeado em memória
+    vocabulary = np.array(vectorizer_feature_names(vectorizer), dtype=str)
+    if np.any(vocabulary[1:] < vocabulary[:-1]):
+        raise ValueError('The vectorizer columns are not in sorted vocabulary order (fixed vocabulary?)')
+    np.save(os.path.join(directory, 'vocabulary.npy'), vocabulary)
+    np.save(os.path.join(directory, 'coef.npy'), np.asarray(model.coef_, dtype=np.float64))
+    np.save(os.path.join(directory, 'intercept.npy'), np.asarray(model.intercept_, dtype=np.float64))
+    np.save(os.path.join(directory, 'classes.npy'), np.asarray(model.classes_))
+    use_idf = getattr(vectorizer, 'use_idf', False)
+    if use_idf:
+        np.save(os.path.join(directory, 'idf.npy'), np.asarray(vectorizer.idf_, dtype=np.float64))
+
+    with open(os.path.join(directory, 'stopwords.json'), 'w', encoding='utf-8') as f:
+        json.dump(sorted(stopwords_set(text_stopwords)), f, ensure_ascii=False)
+    if stem_cache is not None:
+        stem_cache.save(os.path.join(directory, 'stem_cache.json'))
+
+    vectorizer_stopwords = vectorizer.get_stop_words()
+    manifest = {
+        'format_version': BUNDLE_FORMAT_VERSION,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'sklearn_version': sklearn.__version__,
+        'regex_steps': regex_steps,
+        'stem_cache': stem_cache is not None,
+        'stem_cache_maxsize': stem_cache.maxsize if stem_cache is not None else 100000,
+        'vectorizer': {
+            'lowercase': vectorizer.lowercase,
+            'token_pattern': vectorizer.token_pattern,
+            'ngram_range': list(vectorizer.ngram_range),
+            'stop_words': sorted(vectorizer_stopwords) if vectorizer_stopwords is not None else None,
+            'binary': vectorizer.binary,
+            'sublinear_tf': getattr(vectorizer, 'sublinear_tf', False),
+            'use_idf': use_idf,
+            'norm': getattr(vectorizer, 'norm', None),
+            'n_features': len(vocabulary),
+        },
+        'model': {'class': type(model).__name__, 'n_classes': len(model.classes_)},
+    }
+    with open(os.path.join(directory, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    return manifest
+
+
+# [Bundle] Modelo de sentimento carregado sob demanda: só o manifesto é lido no load, os arrays são mapeados
+# em memória no primeiro uso e a predição é feita com numpy/scipy, sem reconstruir o Pipeline do sklearn
+class SentimentBundle:
+
+    def __init__(self, directory, manifest):
+        self.directory = directory
+        self.manifest = manifest
+        self.config = manifest['vectorizer']
+
+    @classmethod
+    def load(cls, directory):
+        """
+        Args
+        -----------
+        directory: folder written by save_sentiment_bundle [type: string]
+        """
+
+        with open(os.path.join(directory, 'manifest.json'), encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('format_version', 0) > BUNDLE_FORMAT_VERSION:
+            raise ValueError(f'Bundle format version {manifest.get("format_version")} is newer than the supported '
+                             f'version {BUNDLE_FORMAT_VERSION}')
+        return cls(directory, manifest)
+
+    def _array(self, name, mmap_mode='r'):
+        return np.load(os.path.join(self.directory, name), mmap_mode=mmap_mode)
+
+    @cached_property
+    def vocabulary(self):
+        return self._array('vocabulary.npy')
+
+    @cached_property
+    def idf(self):
+        return self._array('idf.npy') if self.config['use_idf'] else None
+
+    @cached_property
+    def coef(self):
+        return self._array('coef.npy')
+
+    @cached_property
+    def intercept(self):
+        return self._array('intercept.npy', mmap_mode=None)
+
+    @cached_property
+    def classes(self):
+        return self._array('classes.npy', mmap_mode=None)
+
+    @cached_property
+    def text_stopwords(self):
+        with open(os.path.join(self.directory, 'stopwords.json'), encoding='utf-8') as f:
+            return frozenset(json.load(f))
+
+    @cached_property
+    def stem_cache(self):
+        filename = os.path.join(self.directory, 'stem_cache.json')
+        return StemCache.load(filename, maxsize=self.manifest['stem_cache_maxsize'])
+
+    @cached_property
+    def normalizer(self):
+        return TextNormalizer([DEFAULT_REGEX_TRANSFORMERS[step] for step in self.manifest['regex_steps']])
+
+    @cached_property
+    def _token_pattern(self):
+        return re.compile(self.config['token_pattern'])
+
+    @cached_property
+    def _vectorizer_stopwords(self):
+        stop_words = self.config['stop_words']
+        return frozenset(stop_words) if stop_words is not None else None
+
+    def prepare(self, texts):
+        # Mesmo encadeamento de ApplyRegex -> StopWordsRemoval -> StemmingProcess, em uma única passagem
+        return [' '.join(stopwords_stemming(text, self.text_stopwords, self.stem_cache))
+                for text in self.normalizer.transform(texts)]
+
+    def _analyze(self, text):
+        # Reproduz o analisador 'word' do CountVectorizer: minúsculas, token_pattern, stopwords e n-grams
+        if self.config['lowercase']:
+            text = text.lower()
+        tokens = self._token_pattern.findall(text)
+        if self._vectorizer_stopwords is not None:
+            tokens = [t for t in tokens if t not in self._vectorizer_stopwords]
+
+        min_n, max_n = self.config['ngram_range']
+        if max_n == 1:
+            return tokens
+        grams = list(tokens) if min_n == 1 else []
+        for n in range(max(min_n, 2), max_n + 1):
+            grams += [' '.join(tokens[i: i + n]) for i in range(len(tokens) - n + 1)]
+        return grams
+
+    def vectorize(self, texts):
+        from scipy.sparse import csr_matrix, diags
+
+        rows, terms = [], []
+        for i, text in enumerate(texts):
+            grams = self._analyze(text)
+            rows += [i] * len(grams)
+            terms += grams
+
+        # Busca binária dos termos no vocabulário ordenado e mapeado em memória
+        n_features = self.config['n_features']
+        rows = np.asarray(rows, dtype=np.int64)
+        terms = np.asarray(terms, dtype=str)
+        positions = np.searchsorted(self.vocabulary, terms).clip(max=max(n_features - 1, 0))
+        found = self.vocabulary[positions] == terms if len(terms) else np.zeros(0, dtype=bool)
+        features = csr_matrix((np.ones(found.sum()), (rows[found], positions[found])),
+                              shape=(len(texts), n_features))
+        features.sum_duplicates()
+
+        if self.config['binary']:
+            features.data[:] = 1
+        if self.config['sublinear_tf']:
+            features.data = np.log(features.data) + 1
+        if self.idf is not None:
+            features.data *= self.idf[features.indices]
+        if self.config['norm'] is not None:
+            if self.config['norm'] == 'l2':
+                norms = np.sqrt(np.asarray(features.multiply(features).sum(axis=1)).ravel())
+            else:
+                norms = np.asarray(abs(features).sum(axis=1)).ravel()
+            norms[norms == 0] = 1
+            features = diags(1 / norms) @ features
+        return features
+
+    def predict_proba(self, features):
+        decision = np.asarray(features @ self.coef.T) + self.intercept
+        if decision.shape[1] == 1:
+            positive = 1 / (1 + np.exp(-decision[:, 0]))
+            return np.column_stack([1 - positive, positive])
+        decision = np.exp(decision - decision.max(axis=1, keepdims=True))
+        return decision / decision.sum(axis=1, keepdims=True)
+
+    def score(self, texts, batch_size=10000, as_frame=True):
+        """
+        Args
+        -----------
+        texts: raw review comments to be scored [type: list, pd.Series or iterable]
+        batch_size: number of texts prepared and scored at a time [type: int, default: 10000]
+        as_frame: returns a DataFrame instead of the (labels, probabilities) arrays [type: bool, default: True]
+        """
+
+        if isinstance(texts, str):
+            texts = [texts]
+
+        probas = [self.predict_proba(self.vectorize(self.prepare(batch)))
+                  for batch in iter_corpus_chunks(texts, batch_size)]
+        proba = np.concatenate(probas) if probas else np.empty((0, len(self.classes)))
+        labels = self.classes[proba.argmax(axis=1)]
+        if not as_frame:
+            return labels, proba
+
+        return sentiment_scores_frame(labels, proba, self.classes)
@@ -1,13 +1,20 @@
-import pandas as pd
-import numpy as np
-import matplotlib
-import matplotlib.pyplot as plt
-import seaborn as sns
+from import_utils import lazy_import
 from warnings import filterwarnings
 filterwarnings('ignore')
 from typing import *
 from dataclasses import dataclass
 from math import ceil
+from concurrent.futures import ProcessPoolExecutor
+import weakref
+import io
+import os
+
+# Bibliotecas gráficas importadas apenas no primeiro uso (importar viz_utils não carrega matplotlib/seaborn)
+pd = lazy_import('pandas')
+np = lazy_import('numpy')
+matplotlib = lazy_import('matplotlib')
+plt = lazy_import('matplotlib.pyplot')
+sns = lazy_import('seaborn')
 
 
 # Formatando eixos do matplotlib
@@ -37,9 +44,9 @@ def format_spines(ax, right_border=True):
 # Classe para plotagem dos rótulos dos dados em gráficos de barras
 # Referência: https://towardsdatascience.com/annotating-bar-charts-and-other-matplolib-techniques-cecb54315015
 #Alias types to reduce typing, no pun intended
-Patch = matplotlib.patches.Patch
+Patch = 'matplotlib.patches.Patch'
 PosVal = Tuple[float, Tuple[float, float]]
-Axis = matplotlib.axes.Axes
+Axis = 'matplotlib.axes.Axes'
 PosValFunc = Callable[[Patch], PosVal]
 
 @dataclass
@@ -139,194 +146,573 @@ def target_correlation_matrix(data, label_name, ax, n_vars=10, corr='positive',
     return
 
 
-# Distplot para comparação de densidade das features baseadas na variável target
-def distplot(df, features, fig_cols, hue=False, color=['crimson', 'darkslateblue'], hist=False, figsize=(16, 12)):
-    # Definindo variáveis de controle
-    n_features = len(features)
-    fig_cols = fig_cols
-    fig_rows = ceil(n_features / fig_cols)
-    i, j, color_idx = (0, 0, 0)
+# Função responsável por retornar os códigos das classes do hue (uma única fatorização para todas as features)
+def hue_groups(df, hue, order=False):
+    """
+    Parâmetros
+    ----------
+    df: conjunto de dados [pd.DataFrame]
+    hue: coluna de quebra (False para um único grupo) [str]
+    order: ordena as classes por volumetria (caso contrário, a ordem de categorias do seaborn) [bool]
 
-    # Plotando gráficos
-    fig, axs = plt.subplots(nrows=fig_rows, ncols=fig_cols, figsize=figsize)
+    Retorno
+    -------
+    codes, classes: classe de cada linha (-1 para nulos) e classes observadas, na ordem de plotagem [np.array, list]
+    """
 
-    # Percorrendo por cada uma das features
-    for col in features:
-        try:
-            ax = axs[i, j]
-        except:
-            ax = axs[j]
-        target_idx = 0
+    if hue == False or hue is None:
+        return np.zeros(len(df), dtype=np.int64), [None]
 
-        # Plotando, para cada eixo, um gráfico por classe target
-        if hue != False:
-            for classe in df[hue].value_counts().index:
-                df_hue = df[df[hue] == classe]
-                sns.distplot(df_hue[col], color=color[target_idx], hist=hist, ax=ax, label=classe)
-                target_idx += 1
-        else:
-            sns.distplot(df[col], color=color, hist=hist, ax=ax)
+    values = df[hue]
+    codes, categories = category_codes(values, sort=pd.api.types.is_numeric_dtype(values.dtype))
+    counts = np.bincount(codes[codes >= 0], minlength=len(categories))
+    rank = np.argsort(-counts, kind='stable') if order else np.arange(len(categories))
+    rank = rank[counts[rank] > 0]
 
-        # Incrementando índices
-        j += 1
-        if j == fig_cols:
-            j = 0
-            i += 1
+    remap = np.full(len(categories), -1, dtype=np.int64)
+    remap[rank] = np.arange(len(rank))
+    codes = np.where(codes >= 0, remap[codes], -1)
+    return codes, list(categories[rank])
+
+
+# Função responsável por retornar os valores numéricos válidos de uma feature e os respectivos grupos
+def grouped_values(df, col, codes):
+    values = df[col].to_numpy(dtype='float64', na_value=np.nan)
+    valid = (codes >= 0) & np.isfinite(values)
+    return values[valid], codes[valid]
+
+
+# Função responsável por estimar a densidade (KDE gaussiano) de cada grupo por binning linear + convolução via FFT
+def binned_kde(values, codes, n_groups, gridsize=512, cut=3, bw_adjust=1):
+    """
+    Parâmetros
+    ----------
+    values: valores numéricos válidos [np.array]
+    codes: grupo de cada valor (0 a n_groups - 1) [np.array]
+    n_groups: quantidade de grupos [int]
+    gridsize: pontos da grade de avaliação [int]
+    cut: extensão da grade além dos extremos, em larguras de banda [float]
+    bw_adjust: multiplicador da largura de banda de Scott (mesma regra do gaussian_kde do seaborn) [float]
+
+    Retorno
+    -------
+    grid, density: grade comum e densidade de cada grupo [np.array, np.array (n_groups x gridsize)]
+    """
+
+    # Feature sem valores válidos: grade unitária e densidade nula para todos os grupos (nada a desenhar)
+    if len(values) == 0:
+        return np.linspace(0., 1., gridsize), np.zeros((n_groups, gridsize))
+
+    # Estatísticas suficientes de todos os grupos em uma única passagem (regra de Scott: std * n^(-1/5))
+    n = np.bincount(codes, minlength=n_groups).astype('float64')
+    total = np.bincount(codes, weights=values, minlength=n_groups)
+    total_sq = np.bincount(codes, weights=values * values, minlength=n_groups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = total / n
+        std = np.sqrt(np.maximum(total_sq - n * mean ** 2, 0) / np.maximum(n - 1, 1))
+        bw = bw_adjust * std * n ** (-1 / 5)
+
+    # Grupos constantes (ou vazios) recebem uma banda mínima para evitar divisão por zero
+    value_range = values.max() - values.min()
+    min_bw = max(value_range, 1.) / gridsize
+    bw = np.where(np.isfinite(bw) & (bw > 0), bw, min_bw)
+    lower, upper = values.min() - cut * bw.max(), values.max() + cut * bw.max()
+    grid = np.linspace(lower, upper, gridsize)
+    dx = grid[1] - grid[0]
+
+    # Binning linear: cada valor é dividido entre os dois pontos vizinhos da grade
+    position = (values - lower) / dx
+    left = np.clip(np.floor(position).astype(np.int64), 0, gridsize - 2)
+    frac = position - left
+    index = codes * gridsize + left
+    binned = (np.bincount(index, weights=1 - frac, minlength=n_groups * gridsize) +
+              np.bincount(index + 1, weights=frac, minlength=n_groups * gridsize)).reshape(n_groups, gridsize)
+
+    # Convolução com o kernel gaussiano de cada grupo (zero padding evita o efeito circular da FFT)
+    size = 2 * gridsize
+    offsets = np.fft.fftfreq(size, d=1. / size) * dx
+    kernel = np.exp(-0.5 * (offsets[None, :] / bw[:, None]) ** 2) / (bw[:, None] * np.sqrt(2 * np.pi))
+    density = np.fft.irfft(np.fft.rfft(binned, size) * np.fft.rfft(kernel, size), size)[:, :gridsize]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        density = np.maximum(density, 0) / n[:, None]
+    return grid, np.nan_to_num(density)
+
+
+# Função responsável por calcular o histograma de cada grupo em uma única passagem
+def grouped_histogram(values, codes, n_groups, bins=50, value_range=None):
+    """
+    Parâmetros
+    ----------
+    values: valores numéricos válidos [np.array]
+    codes: grupo de cada valor (0 a n_groups - 1) [np.array]
+    n_groups: quantidade de grupos [int]
+    bins: quantidade de intervalos (comuns a todos os grupos) [int]
+    value_range: limites do histograma (padrão: mínimo e máximo dos valores) [tuple]
+
+    Retorno
+    -------
+    edges, counts: limites dos intervalos e contagens de cada grupo [np.array, np.array (n_groups x bins)]
+    """
+
+    # Sem valores válidos (e sem limites informados), o histograma vazio usa o intervalo unitário
+    if value_range is None:
+        value_range = (values.min(), values.max()) if len(values) else (0., 1.)
+    lower, upper = value_range
+    upper = upper if upper > lower else lower + 1.
+    edges = np.linspace(lower, upper, bins + 1)
+    index = np.clip(((values - lower) / (upper - lower) * bins).astype(np.int64), 0, bins - 1)
+    counts = np.bincount(codes * bins + index, minlength=n_groups * bins).reshape(n_groups, bins)
+    return edges, counts
+
+
+# Função responsável por estimar quantis de cada grupo a partir do histograma (interpolação dentro do intervalo)
+def histogram_quantiles(edges, counts, q):
+    """
+    Parâmetros
+    ----------
+    edges: limites dos intervalos do histograma [np.array]
+    counts: contagens de cada grupo [np.array (n_groups x bins)]
+    q: quantis desejados, entre 0 e 1 [list]
+
+    Retorno
+    -------
+    quantiles: quantis de cada grupo [np.array (n_groups x len(q))]
+    """
+
+    q = np.asarray(q, dtype='float64')
+    quantiles = np.full((counts.shape[0], len(q)), np.nan)
+    for g, group_counts in enumerate(counts):
+        total = group_counts.sum()
+        if total == 0:
+            continue
+        cdf = np.concatenate([[0.], np.cumsum(group_counts) / total])
+        quantiles[g] = np.interp(q, cdf, edges)
+    return quantiles
+
+
+# Função responsável por amostrar linhas de forma estratificada por grupo, respeitando um orçamento de pontos
+def stratified_sample(codes, n_groups, budget=5000, seed=42):
+    """
+    Parâmetros
+    ----------
+    codes: grupo de cada linha (-1 para linhas descartadas) [np.array]
+    n_groups: quantidade de grupos [int]
+    budget: quantidade aproximada de pontos da amostra (alocação proporcional ao tamanho do grupo) [int]
+    seed: semente aleatória [int]
+
+    Retorno
+    -------
+    rows: posições das linhas amostradas, em ordem crescente [np.array]
+    """
+
+    rows = np.flatnonzero(codes >= 0)
+    if len(rows) <= budget:
+        return rows
+
+    # Ordenação por (grupo, chave aleatória): as primeiras posições de cada grupo formam uma amostra sem reposição
+    sizes = np.bincount(codes[rows], minlength=n_groups)
+    quota = np.minimum(sizes, np.ceil(budget * sizes / len(rows)).astype(np.int64))
+    rng = np.random.default_rng(seed)
+    rows = rows[np.argsort(codes[rows] + rng.random(len(rows)), kind='stable')]
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    rank = np.arange(len(rows)) - starts[codes[rows]]
+    return np.sort(rows[rank < quota[codes[rows]]])
 
-        # Customizando plotagem
-        ax.set_title(f'Feature: {col}', color='dimgrey', size=14)
-        plt.setp(ax, yticks=[])
-        sns.set(style='white')
-        sns.despine(left=True)
+
+# Função responsável por desenhar um letter-value plot (boxenplot) a partir de quantis já calculados
+def letter_value_boxes(ax, quantile_levels, classes, colors, width=0.8):
+    """
+    Parâmetros
+    ----------
+    ax: eixo onde as caixas serão desenhadas [matplotlib.axes.Axes]
+    quantile_levels: por grupo, lista de (quantil inferior, quantil superior) da caixa central para fora, e mediana
+                     [list of (list, float)]
+    classes: rótulos dos grupos no eixo x [list]
+    colors: cor base de cada grupo [list]
+    width: largura da caixa central [float]
+    """
+
+    from matplotlib.patches import Rectangle
+
+    for position, ((levels, median), color) in enumerate(zip(quantile_levels, colors)):
+        if np.isnan(median):
+            continue
+        cmap = sns.light_palette(color, as_cmap=True)
+        for k, (lower, upper) in reversed(list(enumerate(levels))):
+            # Caixas mais externas (quantis mais extremos) com metade da largura e cor mais clara a cada nível,
+            # como no width_method='exponential' do seaborn
+            box_width = width * 2. ** -k
+            ax.add_patch(Rectangle((position - box_width / 2, lower), box_width, upper - lower,
+                                   facecolor=cmap(2. ** (-k / 3)), edgecolor='white', linewidth=0.5))
+        ax.plot([position - width / 2, position + width / 2], [median, median], color='dimgrey', linewidth=1.5)
+
+    ax.set_xlim(-0.5, len(classes) - 0.5)
+    ax.set_xticks(range(len(classes)))
+    ax.set_xticklabels(['' if c is None else c for c in classes])
+    ax.autoscale(axis='y')
+
+
+# Processos de renderização: backend Agg (sem interface gráfica) e o mesmo estilo (rcParams) do processo principal
+def _init_render_worker(rc):
+    plt.switch_backend('Agg')
+    plt.rcParams.update(rc)
+
+
+# Função executada em cada processo: desenha um painel em uma figura própria e o retorna como imagem PNG
+def _render_panel(task):
+    panel_func, args, panel_kws, panel_size, dpi, export_file = task
+    fig, ax = plt.subplots(figsize=panel_size)
+    panel_func(ax, *args, **panel_kws)
+    fig.tight_layout()
+    if export_file is not None:
+        fig.savefig(export_file, dpi=dpi)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=dpi)
+    plt.close(fig)
+    return buffer.getvalue()
+
+
+# Função responsável por desenhar uma grade de painéis (um por feature), em série ou em paralelo por processos
+def grid_plot(panel_func, panels, fig_cols, figsize, panel_kws=None, n_jobs=1, chunksize=1, export_dir=None,
+              export_format='png', prefix='panel', dpi=100):
+    """
+    Parâmetros
+    ----------
+    panel_func: função de módulo que desenha um painel, chamada como panel_func(ax, *args, **panel_kws) [callable]
+    panels: argumentos de cada painel, na ordem da grade [list of tuple]
+    fig_cols: quantidade de colunas da grade [int]
+    figsize: dimensões da figura completa [tuple]
+    panel_kws: argumentos comuns a todos os painéis [dict]
+    n_jobs: processos de renderização; 1 desenha em série na própria figura e -1 usa todos os núcleos [int]
+    chunksize: painéis enviados por tarefa a cada processo [int]
+    export_dir: diretório para exportar cada painel e a figura completa (exportação headless em lote) [str]
+    export_format: formato dos painéis exportados ('png' ou 'svg'); a figura completa é salva em png [str]
+    prefix: prefixo dos arquivos exportados [str]
+    dpi: resolução dos painéis renderizados e exportados [int]
+
+    Retorno
+    -------
+    fig, axs: figura (layout já ajustado) e eixos da grade [matplotlib.figure.Figure, np.array]
+    """
+
+    panel_kws = panel_kws or {}
+    fig_rows = ceil(len(panels) / fig_cols)
+    panel_size = (figsize[0] / fig_cols, figsize[1] / fig_rows)
+    fig, axs = plt.subplots(nrows=fig_rows, ncols=fig_cols, figsize=figsize)
+    flat_axs = np.atleast_1d(axs).ravel()
+
+    export_files = [None] * len(panels)
+    if export_dir is not None:
+        os.makedirs(export_dir, exist_ok=True)
+        export_files = [os.path.join(export_dir, f'{prefix}_{k:02d}.{export_format}') for k in range(len(panels))]
+
+    if n_jobs == 1:
+        # Renderização em série, diretamente nos eixos da figura
+        for ax, args in zip(flat_axs, panels):
+            panel_func(ax, *args, **panel_kws)
+        fig.tight_layout()
+
+        # Painéis exportados a partir dos eixos já desenhados (recorte da figura na área de cada eixo)
+        if export_dir is not None:
+            renderer = fig.canvas.get_renderer()
+            for ax, export_file in zip(flat_axs, export_files):
+                bbox = ax.get_tightbbox(renderer).transformed(fig.dpi_scale_trans.inverted())
+                fig.savefig(export_file, dpi=dpi, bbox_inches=bbox.padded(0.05))
+    else:
+        # Estatísticas e desenho de cada painel em um processo (Agg); a figura final compõe as imagens
+        rc = {key: value for key, value in plt.rcParams.items() if key != 'backend'}
+        tasks = [(panel_func, args, panel_kws, panel_size, dpi, export_file)
+                 for args, export_file in zip(panels, export_files)]
+        with ProcessPoolExecutor(max_workers=None if n_jobs == -1 else n_jobs, initializer=_init_render_worker,
+                                 initargs=(rc,)) as executor:
+            images = list(executor.map(_render_panel, tasks, chunksize=chunksize))
+        for ax, image in zip(flat_axs, images):
+            ax.imshow(plt.imread(io.BytesIO(image)))
+            ax.axis('off')
+        fig.subplots_adjust(left=0, right=1, bottom=0, top=1, wspace=0, hspace=0)
 
     # Tratando caso apartado: figura(s) vazia(s)
-    i, j = (0, 0)
-    for n_plots in range(fig_rows * fig_cols):
+    for ax in flat_axs[len(panels):]:
+        ax.axis('off')
 
-        # Se o índice do eixo for maior que a quantidade de features, elimina as bordas
-        if n_plots >= n_features:
-            try:
-                axs[i][j].axis('off')
-            except TypeError as e:
-                axs[j].axis('off')
+    if export_dir is not None:
+        fig.savefig(os.path.join(export_dir, f'{prefix}.png'), dpi=dpi)
+    return fig, axs
 
-        # Incrementando
-        j += 1
-        if j == fig_cols:
-            j = 0
-            i += 1
 
-    # Finalizando customização
-    plt.tight_layout()
+# Função responsável por desenhar as curvas de densidade (e histogramas) de todas as classes de uma feature
+def draw_density(ax, values, groups, classes, colors, hist=False, gridsize=512, bins=50):
+    # KDE (e histograma) de todas as classes em uma única passagem pelos dados
+    grid, density = binned_kde(values, groups, len(classes), gridsize=gridsize)
+    if hist:
+        edges, counts = grouped_histogram(values, groups, len(classes), bins=bins)
+        widths = np.diff(edges)
+
+    # Classes sem valores válidos não são desenhadas (assim como no distplot do seaborn)
+    sizes = np.bincount(groups, minlength=len(classes))
+    for target_idx, classe in enumerate(classes):
+        if sizes[target_idx] == 0:
+            continue
+        class_color = colors[target_idx % len(colors)]
+        if hist:
+            ax.bar(edges[:-1], counts[target_idx] / (counts[target_idx].sum() * widths), width=widths,
+                   align='edge', color=class_color, alpha=0.4)
+        ax.plot(grid, density[target_idx], color=class_color, label=classe)
+
+
+# Painel do distplot: densidade de uma feature por classe target
+def distplot_panel(ax, col, values, groups, classes, colors, hist=False, gridsize=512, bins=50):
+    draw_density(ax, values, groups, classes, colors, hist=hist, gridsize=gridsize, bins=bins)
+    ax.set_xlabel(col)
+
+    # Customizando plotagem
+    ax.set_title(f'Feature: {col}', color='dimgrey', size=14)
+    plt.setp(ax, yticks=[])
+    sns.despine(ax=ax, left=True)
+
+
+# Distplot para comparação de densidade das features baseadas na variável target
+def distplot(df, features, fig_cols, hue=False, color=['crimson', 'darkslateblue'], hist=False, figsize=(16, 12),
+             gridsize=512, bins=50, n_jobs=1, export_dir=None, export_format='png'):
+    # Classes do hue (em ordem de volumetria) calculadas uma única vez para todas as features
+    codes, classes = hue_groups(df, hue, order=True)
+    colors = color if hue != False else [color if isinstance(color, str) else color[0]]
+    sns.set(style='white')
+
+    # Plotando gráficos: um painel por feature, com os valores válidos e as classes de cada linha
+    panels = [(col, *grouped_values(df, col, codes)) for col in features]
+    grid_plot(distplot_panel, panels, fig_cols, figsize, n_jobs=n_jobs, export_dir=export_dir,
+              export_format=export_format, prefix='distplot',
+              panel_kws=dict(classes=classes, colors=colors, hist=hist, gridsize=gridsize, bins=bins))
     plt.show()
 
 
+# Painel do stripplot: amostra estratificada por classe, limitada a max_points pontos
+def stripplot_panel(ax, col, values, codes, classes, hue=False, palette='viridis', max_points=5000):
+    rows = stratified_sample(np.where(np.isfinite(values), codes, -1), len(classes), budget=max_points)
+    y = pd.Series(values[rows], name=col)
+
+    # Plotando gráfico atribuindo a variável target como hue
+    if hue != False:
+        x = pd.Series(np.asarray(classes, dtype=object)[codes[rows]], name=hue)
+        sns.stripplot(x=x, y=y, hue=x, ax=ax, palette=palette, order=classes, hue_order=classes, legend=False)
+    else:
+        sns.stripplot(y=y, ax=ax, color=sns.color_palette(palette, 1)[0])
+
+    # Formatando gráfico
+    format_spines(ax, right_border=False)
+    ax.set_title(f'Feature: {col.upper()}', size=14, color='dimgrey')
+
+
 # Função para plotagem de stripplot
-def stripplot(df, features, fig_cols, hue=False, palette='viridis', figsize=(16, 12)):
-    # Definindo variáveis de controle
-    n_features = len(features)
-    fig_cols = fig_cols
-    fig_rows = ceil(n_features / fig_cols)
-    i, j, color_idx = (0, 0, 0)
+def stripplot(df, features, fig_cols, hue=False, palette='viridis', figsize=(16, 12), max_points=5000, n_jobs=1,
+              export_dir=None, export_format='png'):
+    # Classes do hue calculadas uma única vez para todas as features
+    codes, classes = hue_groups(df, hue)
 
     # Plotando gráficos
-    fig, axs = plt.subplots(nrows=fig_rows, ncols=fig_cols, figsize=figsize)
+    panels = [(col, df[col].to_numpy(dtype='float64', na_value=np.nan), codes) for col in features]
+    grid_plot(stripplot_panel, panels, fig_cols, figsize, n_jobs=n_jobs, export_dir=export_dir,
+              export_format=export_format, prefix='stripplot',
+              panel_kws=dict(classes=classes, hue=hue, palette=palette, max_points=max_points))
+
+
+# Painel do boxenplot: letter values de todas as classes a partir de um único histograma agrupado
+def boxenplot_panel(ax, col, values, groups, classes, colors, hue=False, bins=4096):
+    # Profundidade pela regra de Tukey (log2(n) - 3 níveis), como no boxenplot do seaborn
+    edges, counts = grouped_histogram(values, groups, len(classes), bins=bins)
+    sizes = counts.sum(axis=1)
+    depth = max(int(np.log2(max(sizes.max(), 2))) - 3, 2)
+    tails = [2. ** -k for k in range(2, depth + 1)]
+    quantiles = histogram_quantiles(edges, counts, tails + [1 - t for t in tails] + [0.5])
+    quantile_levels = []
+    for g, size in enumerate(sizes):
+        group_depth = max(int(np.log2(max(size, 2))) - 3, 2) - 1
+        levels = [(quantiles[g, k], quantiles[g, len(tails) + k]) for k in range(group_depth)]
+        quantile_levels.append((levels, quantiles[g, -1]))
+    letter_value_boxes(ax, quantile_levels, classes, colors)
+    ax.set_xlabel(hue if hue != False else '')
+    ax.set_ylabel(col)
+
+    # Formatando gráfico
+    format_spines(ax, right_border=False)
+    ax.set_title(f'Feature: {col.upper()}', size=14, color='dimgrey')
 
-    # Plotando gráfico
-    for col in features:
-        try:
-            ax = axs[i, j]
-        except:
-            ax = axs[j]
 
-        # Plotando gráfico atribuindo a variável target como hue
-        if hue != False:
-            sns.stripplot(x=df[hue], y=df[col], ax=ax, palette=palette)
-        else:
-            sns.stripplot(y=df[col], ax=ax, palette=palette)
+def boxenplot(df, features, fig_cols, hue=False, palette='viridis', figsize=(16, 12), bins=4096, n_jobs=1,
+              export_dir=None, export_format='png'):
+    # Classes do hue e cores calculadas uma única vez para todas as features
+    codes, classes = hue_groups(df, hue)
+    colors = sns.color_palette(palette, len(classes))
 
-        # Formatando gráfico
-        format_spines(ax, right_border=False)
-        ax.set_title(f'Feature: {col.upper()}', size=14, color='dimgrey')
-        plt.tight_layout()
+    # Plotando gráficos
+    panels = [(col, *grouped_values(df, col, codes)) for col in features]
+    grid_plot(boxenplot_panel, panels, fig_cols, figsize, n_jobs=n_jobs, export_dir=export_dir,
+              export_format=export_format, prefix='boxenplot',
+              panel_kws=dict(classes=classes, colors=colors, hue=hue, bins=bins))
 
-        # Incrementando índices
-        j += 1
-        if j == fig_cols:
-            j = 0
-            i += 1
 
-    # Tratando caso apartado: figura(s) vazia(s)
-    i, j = (0, 0)
-    for n_plots in range(fig_rows * fig_cols):
+# Função responsável por retornar os códigos inteiros (-1 para nulos) e as categorias de uma coluna
+def category_codes(values, sort=False):
+    """
+    Parâmetros
+    ----------
+    values: coluna categórica [pd.Series]
+    sort: ordena as categorias de colunas não categóricas (caso contrário, ordem de aparição) [bool]
 
-        # Se o índice do eixo for maior que a quantidade de features, elimina as bordas
-        if n_plots >= n_features:
-            try:
-                axs[i][j].axis('off')
-            except TypeError as e:
-                axs[j].axis('off')
+    Retorno
+    -------
+    codes, categories: código de cada linha e categorias correspondentes [np.array, pd.Index]
+    """
 
-        # Incrementando
-        j += 1
-        if j == fig_cols:
-            j = 0
-            i += 1
+    # Colunas category já possuem códigos inteiros; demais colunas são fatorizadas uma única vez
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy(), values.cat.categories
+    return pd.factorize(values, sort=sort)
 
 
-def boxenplot(df, features, fig_cols, hue=False, palette='viridis', figsize=(16, 12)):
+# Função responsável por contar as categorias de uma coluna em uma única passagem (np.bincount sobre os códigos)
+def category_counts(values, order=True, top=None):
+    """
+    Parâmetros
+    ----------
+    values: coluna categórica a ser contada [pd.Series]
+    order: ordena as categorias por volumetria decrescente (caso contrário, ordem de aparição) [bool]
+    top: mantém apenas as top categorias em volumetria [int]
 
+    Retorno
+    -------
+    counts: volumetria de cada categoria, indexada pela categoria [pd.Series]
+    """
 
-    # Definindo variáveis de controle
-    n_features = len(features)
-    fig_rows = ceil(n_features / fig_cols)
-    i, j, color_idx = (0, 0, 0)
+    # Numéricas em ordem crescente e textuais em ordem de aparição, como no countplot do seaborn
+    codes, categories = category_codes(values, sort=pd.api.types.is_numeric_dtype(values.dtype))
+    counts = pd.Series(np.bincount(codes[codes >= 0], minlength=len(categories)),
+                       index=pd.Index(categories, name=values.name), name='count')
 
-    # Plotando gráficos
-    fig, axs = plt.subplots(nrows=fig_rows, ncols=fig_cols, figsize=figsize)
+    sorted_counts = counts.sort_values(ascending=False, kind='stable')
+    if top is not None:
+        counts = counts[counts.index.isin(sorted_counts.index[:top])]
+        sorted_counts = sorted_counts[:top]
+    return sorted_counts if order else counts
 
-    # Plotando gráfico
-    for col in features:
-        try:
-            ax = axs[i, j]
-        except:
-            ax = axs[j]
 
-        # Plotando gráfico atribuindo a variável target como hue
-        if hue != False:
-            sns.boxenplot(x=df[hue], y=df[col], ax=ax, palette=palette)
+# Função responsável por plotar as barras a partir de um vetor de contagens já calculado
+def counts_barplot(counts, ax, orient='v', palette='plasma', ncount=None, label_fmt='{:.1f}%', size=None):
+    """
+    Parâmetros
+    ----------
+    counts: volumetria de cada categoria, na ordem de plotagem [pd.Series]
+    ax: eixo onde as barras serão plotadas [matplotlib.axes.Axes]
+    orient: 'v' para barras verticais ou 'h' para horizontais [str]
+    palette: paleta de cores das barras [str]
+    ncount: total usado no percentual dos rótulos (padrão: soma das contagens) [int]
+    label_fmt: formato do rótulo, recebendo contagem e percentual (ou só o percentual) [str]
+    size: tamanho da fonte dos rótulos [int]
+
+    Retorno
+    -------
+    None
+    """
+
+    ncount = counts.sum() if ncount is None else ncount
+    categories = list(counts.index)
+    if orient == 'v':
+        sns.barplot(x=categories, y=counts.values, order=categories, palette=palette, ax=ax)
+        ax.set_xlabel(counts.index.name)
+        ax.set_ylabel('count')
+    else:
+        sns.barplot(x=counts.values, y=categories, order=categories, palette=palette, ax=ax, orient='h')
+        ax.set_xlabel('count')
+        ax.set_ylabel(counts.index.name)
+
+    # Rótulos calculados a partir do vetor de contagens (barra i centralizada na posição i); categorias sem
+    # registros não possuem barra nem rótulo
+    n_fields = label_fmt.count('{')
+    for i, count in enumerate(counts.values):
+        if count == 0:
+            continue
+        values = (int(count), 100. * count / ncount)[-n_fields:]
+        if orient == 'v':
+            ax.annotate(label_fmt.format(*values), (i, count), ha='center', va='bottom', size=size)
         else:
-            sns.boxenplot(y=df[col], ax=ax, palette=palette)
+            ax.annotate(label_fmt.format(*values), (count, i), va='center', size=size)
 
-        # Formatando gráfico
-        format_spines(ax, right_border=False)
-        ax.set_title(f'Feature: {col.upper()}', size=14, color='dimgrey')
-        plt.tight_layout()
 
-        # Incrementando índices
-        j += 1
-        if j == fig_cols:
-            j = 0
-            i += 1
+# Cache das tabelas de contingência (opt-in): id do DataFrame -> (versão, {(coluna, hue): tabela})
+CONTINGENCY_CACHE = {}
 
-    # Tratando caso apartado: figura(s) vazia(s)
-    i, j = (0, 0)
-    for n_plots in range(fig_rows * fig_cols):
 
-        # Se o índice do eixo for maior que a quantidade de features, elimina as bordas
-        if n_plots >= n_features:
-            try:
-                axs[i][j].axis('off')
-            except TypeError as e:
-                axs[j].axis('off')
+# Função responsável por calcular as tabelas (feature x hue) de várias colunas a partir dos códigos inteiros
+def contingency_tables(df, features, hue, version=None):
+    """
+    Parâmetros
+    ----------
+    df: conjunto de dados [pd.DataFrame]
+    features: colunas categóricas cruzadas com o hue [list]
+    hue: coluna categórica das colunas das tabelas [str]
+    version: chave explícita da versão dos dados; se informada, as tabelas são reaproveitadas entre chamadas com
+             a mesma chave e devem ter a chave alterada após qualquer modificação do DataFrame. None (padrão)
+             recalcula as tabelas a cada chamada [hashable]
 
-        # Incrementando
-        j += 1
-        if j == fig_cols:
-            j = 0
-            i += 1
+    Retorno
+    -------
+    tables: tabela de contagens (mesmo formato do pd.crosstab) para cada feature [dict]
+    """
+
+    # Sem chave de versão não há cache; com ela, o cache é liberado junto com o DataFrame
+    if version is None:
+        tables = {}
+    else:
+        key, version = id(df), (version, df.shape, tuple(df.columns))
+        if key not in CONTINGENCY_CACHE:
+            weakref.finalize(df, CONTINGENCY_CACHE.pop, key, None)
+        if CONTINGENCY_CACHE.get(key, (None,))[0] != version:
+            CONTINGENCY_CACHE[key] = (version, {})
+        tables = CONTINGENCY_CACHE[key][1]
+
+    # Códigos do hue calculados uma única vez; cada feature é contada por np.bincount sobre o código combinado
+    missing = [col for col in features if (col, hue) not in tables]
+    if missing:
+        hue_codes, hue_categories = category_codes(df[hue], sort=True)
+        n_hue = len(hue_categories)
+        for col in missing:
+            codes, categories = category_codes(df[col], sort=True)
+            valid = (codes >= 0) & (hue_codes >= 0)
+            counts = np.bincount(codes[valid] * n_hue + hue_codes[valid], minlength=len(categories) * n_hue)
+            table = pd.DataFrame(counts.reshape(len(categories), n_hue), index=pd.Index(categories, name=col),
+                                 columns=pd.Index(hue_categories, name=hue))
+
+            # Assim como no pd.crosstab, apenas combinações observadas
+            tables[(col, hue)] = table.loc[table.sum(axis=1) > 0, table.sum(axis=0) > 0]
+
+    return {col: tables[(col, hue)] for col in features}
 
 
 # Função responsável por plotar volumetria de uma variável categórica (quebra por hue é opcional)
 def countplot(df, feature, order=True, hue=False, label_names=None, palette='plasma', colors=['darkgray', 'navy'],
-              figsize=(12, 5), loc_legend='lower left', width=0.75, sub_width=0.3, sub_size=12):
+              figsize=(12, 5), loc_legend='lower left', width=0.75, sub_width=0.3, sub_size=12, counts=None,
+              version=None):
+
+    # Contagem única da variável (ou contagens já calculadas, com df=None quando não há quebra por hue)
+    if counts is None:
+        counts = category_counts(df[feature], order=order)
+        ncount = len(df)
+    else:
+        ncount = counts.sum()
 
     # Verificando plotagem por quebra de alguma variável categórica
-    ncount = len(df)
     if hue != False:
         # Redifinindo dimensões e plotando gráfico solo + versus variável categórica
         figsize = (figsize[0], figsize[1] * 2)
         fig, axs = plt.subplots(nrows=2, ncols=1, figsize=figsize)
-        if order:
-            sns.countplot(x=feature, data=df, palette=palette, ax=axs[0], order=df[feature].value_counts().index)
-        else:
-            sns.countplot(x=feature, data=df, palette=palette, ax=axs[0])
+        counts_barplot(counts, axs[0], palette=palette, ncount=ncount, size=sub_size)
 
         # Plotando gráfico de análise por hue (stacked bar chart)
-        feature_rate = pd.crosstab(df[feature], df[hue])
+        feature_rate = contingency_tables(df, [feature], hue, version=version)[feature]
         percent_df = feature_rate.div(feature_rate.sum(1).astype(float), axis=0)
         if order:
-            sort_cols = list(df[feature].value_counts().index)
+            sort_cols = list(counts.index)
             sorter_index = dict(zip(sort_cols, range(len(sort_cols))))
             percent_df['rank'] = percent_df.index.map(sorter_index)
             percent_df = percent_df.sort_values(by='rank')
@@ -336,14 +722,6 @@ def countplot(df, feature, order=True, hue=False, label_names=None, palette='pla
             percent_df.plot(kind='bar', stacked=True, ax=axs[1], color=colors, width=width)
         # sns.countplot(x=feature, data=df, palette=colors, hue=hue, ax=axs[1], order=df[feature].value_counts().index)
 
-        # Inserindo rótulo de percentual para gráfico singular
-        for p in axs[0].patches:
-            # Coletando parâmetros e inserindo no gráfico
-            x = p.get_bbox().get_points()[:, 0]
-            y = p.get_bbox().get_points()[1, 1]
-            axs[0].annotate('{:.1f}%'.format(100. * y / ncount), (x.mean(), y), ha='center', va='bottom',
-                            size=sub_size)
-
         # Inserindo rótulo de percentual para gráfico hue
         for p in axs[1].patches:
             # Coletando parâmetros
@@ -375,21 +753,12 @@ def countplot(df, feature, order=True, hue=False, label_names=None, palette='pla
     else:
         # Plotagem única: sem quebra por variável hue
         fig, ax = plt.subplots(figsize=figsize)
-        if order:
-            sns.countplot(x=feature, data=df, palette=palette, ax=ax, order=df[feature].value_counts().index)
-        else:
-            sns.countplot(x=feature, data=df, palette=palette, ax=ax)
+        counts_barplot(counts, ax, palette=palette, ncount=ncount)
 
-            # Formatando eixos
+        # Formatando eixos
         ax.set_ylabel('Volumetria')
         format_spines(ax, right_border=False)
 
-        # Inserindo rótulo de percentual
-        for p in ax.patches:
-            x = p.get_bbox().get_points()[:, 0]
-            y = p.get_bbox().get_points()[1, 1]
-            ax.annotate('{:.1f}%'.format(100. * y / ncount), (x.mean(), y), ha='center', va='bottom')
-
         # Definindo título
         ax.set_title(f'Análise de Volumetria da Variável {feature}', size=14, color='dimgrey')
 
@@ -399,13 +768,19 @@ def countplot(df, feature, order=True, hue=False, label_names=None, palette='pla
 
 # Função responsável por plotar volumetria de uma única variável categórica em formato atualizado
 def single_countplot(df, ax, x=None, y=None, top=None, order=True, hue=False, palette='plasma',
-                     width=0.75, sub_width=0.3, sub_size=12):
+                     width=0.75, sub_width=0.3, sub_size=12, counts=None, table=None):
     """
     Parâmetros
     ----------
-    classifiers: conjunto de classificadores em forma de dicionário [dict]
-    X: array com os dados a serem utilizados no treinamento [np.array]
-    y: array com o vetor target do modelo [np.array]
+    df: conjunto de dados com a coluna a ser plotada (pode ser None se counts for informado sem hue, ou se table
+        for informada com hue) [pd.DataFrame]
+    ax: eixo onde o gráfico será plotado [matplotlib.axes.Axes]
+    x, y: coluna plotada no eixo x (barras verticais) ou y (barras horizontais) [str]
+    top: quantidade de categorias com maior volumetria a serem plotadas [int]
+    order: ordena as barras por volumetria [bool]
+    hue: coluna para quebra das barras [str]
+    counts: contagens já calculadas (ex: category_counts), dispensando a leitura do df [pd.Series]
+    table: tabela (coluna x hue) já calculada (ex: contingency_tables), dispensando a leitura do df [pd.DataFrame]
 
     Retorno
     -------
@@ -413,124 +788,129 @@ def single_countplot(df, ax, x=None, y=None, top=None, order=True, hue=False, pa
     """
 
     # Verificando plotagem por quebra de alguma variável categórica
-    ncount = len(df)
     if x:
         col = x
     else:
         col = y
 
-    # Verificando a plotagem de top categorias
-    if top is not None:
-        cat_count = df[col].value_counts()
-        top_categories = cat_count[:top].index
-        df = df[df[col].isin(top_categories)]
+    # Tabela de contingência (coluna x hue) calculada em uma única passagem, ou recebida pronta
+    if hue != False and table is None:
+        if df is None:
+            raise ValueError('Para a quebra por hue, informe df ou a tabela (coluna x hue) em table')
+        table = contingency_tables(df, [col], hue)[col]
+    if counts is None and df is None:
+        if table is None:
+            raise ValueError('Informe df ou as contagens já calculadas em counts')
+        counts = table.sum(axis=1)
+
+    # Contagem única da coluna, já restrita às top categorias (ou contagens recebidas prontas)
+    if counts is None:
+        ncount = len(df)
+        counts = category_counts(df[col], order=order, top=top)
+    else:
+        ncount = counts.sum()
+        counts = counts.sort_values(ascending=False, kind='stable')[:top] if order else counts[:top]
 
     # Validando demais argumentos e plotando gráfico
     if hue != False:
-        if order:
-            sns.countplot(x=x, y=y, data=df, palette=palette, ax=ax, order=df[col].value_counts().index, hue=hue)
+        categories, hue_levels = list(counts.index), list(table.columns)
+        table = table.reindex(categories, fill_value=0)
+        df_counts = table.stack().rename('count').reset_index()
+        if x:
+            sns.barplot(x=col, y='count', hue=hue, data=df_counts, palette=palette, ax=ax, order=categories,
+                        hue_order=hue_levels)
         else:
-            sns.countplot(x=x, y=y, data=df, palette=palette, ax=ax, hue=hue)
+            sns.barplot(x='count', y=col, hue=hue, data=df_counts, palette=palette, ax=ax, order=categories,
+                        hue_order=hue_levels, orient='h')
+        format_spines(ax, right_border=False)
+
+        # Rótulos calculados a partir da tabela: a barra do hue j na categoria i fica centralizada em
+        # i - 0.4 + 0.8 * (j + 0.5) / n_hue (largura padrão 0.8 dividida entre os níveis do hue)
+        n_hue = len(hue_levels)
+        for j, hue_level in enumerate(hue_levels):
+            for i, count in enumerate(table[hue_level].values):
+                if count == 0:
+                    continue
+                position = i - 0.4 + 0.8 * (j + 0.5) / n_hue
+                if x:
+                    ax.annotate('{}\n{:.1f}%'.format(int(count), 100. * count / ncount), (position, count),
+                                ha='center', va='bottom')
+                else:
+                    ax.annotate('{} ({:.1f}%)'.format(int(count), 100. * count / ncount), (count, position),
+                                va='center')
+        return
+
+    # Barras e rótulos desenhados a partir do vetor de contagens: custo independente do número de linhas
+    if x:
+        counts_barplot(counts, ax, orient='v', palette=palette, ncount=ncount, label_fmt='{}\n{:.1f}%')
     else:
-        if order:
-            sns.countplot(x=x, y=y, data=df, palette=palette, ax=ax, order=df[col].value_counts().index)
-        else:
-            sns.countplot(x=x, y=y, data=df, palette=palette, ax=ax)
+        counts_barplot(counts, ax, orient='h', palette=palette, ncount=ncount, label_fmt='{} ({:.1f}%)')
 
     # Formatando eixos
     format_spines(ax, right_border=False)
 
-    # Inserindo rótulo de percentual
-    if x:
-        for p in ax.patches:
-            x = p.get_bbox().get_points()[:, 0]
-            y = p.get_bbox().get_points()[1, 1]
-            ax.annotate('{}\n{:.1f}%'.format(int(y), 100. * y / ncount), (x.mean(), y), ha='center', va='bottom')
+
+# Painel do catplot_analysis: volumetria de uma variável categórica (quebrada por hue a partir da tabela de
+# contingência), desenhada a partir das contagens já calculadas
+def catplot_panel(ax, col, counts, table=None, hue=False, palette='viridis'):
+    order = list(counts.index)
+    if hue != False:
+        df_counts = table.stack().rename('count').reset_index()
+        sns.barplot(x='count', y=col, hue=hue, data=df_counts, palette=palette, ax=ax, order=order, orient='h')
     else:
-        for p in ax.patches:
-            x = p.get_bbox().get_points()[1, 0]
-            y = p.get_bbox().get_points()[:, 1]
-            ax.annotate('{} ({:.1f}%)'.format(int(x), 100. * x / ncount), (x, y.mean()), va='center')
+        sns.barplot(x=counts.values, y=order, palette=palette, ax=ax, order=order, orient='h')
+        ax.set_xlabel('count')
+        ax.set_ylabel(col)
+
+    # Customizando gráfico
+    format_spines(ax, right_border=False)
+    AnnotateBars(n_dec=0, color='dimgrey').horizontal(ax)
+    ax.set_title(col)
 
 
 # Função para plotagem de volumetria das variáveis categóricas do conjunto de dados
-def catplot_analysis(df_categorical, fig_cols=3, hue=False, palette='viridis', figsize=(16, 10)):
+def catplot_analysis(df_categorical, fig_cols=3, hue=False, palette='viridis', figsize=(16, 10), n_jobs=1,
+                     export_dir=None, export_format='png', version=None):
     # Retornando parâmetros para organização da figura
     if hue != False:
         cat_features = list(df_categorical.drop(hue, axis=1).columns)
+        hue_tables = contingency_tables(df_categorical, cat_features, hue, version=version)
     else:
         cat_features = list(df_categorical.columns)
-
-    total_cols = len(cat_features)
-    fig_cols = fig_cols
-    fig_rows = ceil(total_cols / fig_cols)
-    ncount = len(cat_features)
+        hue_tables = {col: None for col in cat_features}
 
     # Retornando parâmetros para organização da figura
     sns.set(style='white', palette='muted', color_codes=True)
-    total_cols = len(cat_features)
-    fig_rows = ceil(total_cols / fig_cols)
 
-    # Criando figura de plotagem
-    fig, axs = plt.subplots(nrows=fig_rows, ncols=fig_cols, figsize=(figsize))
-    i, j = 0, 0
+    # Painéis desenhados a partir das contagens (e tabelas de contingência) de cada variável
+    panels = [(col, category_counts(df_categorical[col]), hue_tables[col]) for col in cat_features]
+    grid_plot(catplot_panel, panels, fig_cols, figsize, n_jobs=n_jobs, export_dir=export_dir,
+              export_format=export_format, prefix='catplot', panel_kws=dict(hue=hue, palette=palette))
+    plt.show()
 
-    # Laço de repetição para plotagem categórica
-    for col in cat_features:
-        # Indexando variáveis e plotando gráfico
-        try:
-            ax = axs[i, j]
-        except:
-            ax = axs[j]
-        if hue != False:
-            sns.countplot(y=col, data=df_categorical, palette=palette, ax=ax, hue=hue,
-                          order=df_categorical[col].value_counts().index)
-        else:
-            sns.countplot(y=col, data=df_categorical, palette=palette, ax=ax,
-                          order=df_categorical[col].value_counts().index)
 
-        # Customizando gráfico
-        format_spines(ax, right_border=False)
-        AnnotateBars(n_dec=0, color='dimgrey').horizontal(ax)
+# Painel do numplot_analysis: densidade de uma variável numérica (por classe do hue, se houver)
+def numplot_panel(ax, col, values, groups, colors, title_color=None, classes=None, hist=False):
+    draw_density(ax, values, groups, classes, colors, hist=hist)
+    ax.set_xlabel(col)
+    if title_color is not None:
+        ax.set_title(col, color=title_color)
+    else:
         ax.set_title(col)
 
-        # Incrementando índices de eixo
-        j += 1
-        if j == fig_cols:
-            j = 0
-            i += 1
-
-    # Tratando caso apartado: figura(s) vazia(s)
-    i, j = (0, 0)
-    for n_plots in range(fig_rows * fig_cols):
-
-        # Se o índice do eixo for maior que a quantidade de features, elimina as bordas
-        if n_plots >= len(cat_features):
-            try:
-                axs[i][j].axis('off')
-            except TypeError as e:
-                axs[j].axis('off')
-
-        # Incrementando
-        j += 1
-        if j == fig_cols:
-            j = 0
-            i += 1
-
-    plt.tight_layout()
-    plt.show()
+    # Customizando gráfico
+    sns.despine(ax=ax, left=True)
+    format_spines(ax, right_border=False)
+    plt.setp(ax, yticks=[])
 
 
 # Função para plotagem de volumetria das variáveis categóricas do conjunto de dados
 def numplot_analysis(df_numerical, fig_cols=3, color_sequence=['darkslateblue', 'mediumseagreen', 'darkslateblue'],
-                     hue=False, color_hue=['darkslateblue', 'crimson'], hist=False):
+                     hue=False, color_hue=['darkslateblue', 'crimson'], hist=False, n_jobs=1, export_dir=None,
+                     export_format='png'):
     # Configurando sets do seaborn
     sns.set(style='white', palette='muted', color_codes=True)
 
-    # Criando um DataFrame de variáveis categóricas
-    #num_features = [col for col, dtype in df.dtypes.items() if dtype != 'object']
-    #df_numerical = df.loc[:, num_features]
-
     # Retornando parâmetros para organização da figura
     if hue != False:
         num_features = list(df_numerical.drop(hue, axis=1).columns)
@@ -538,147 +918,103 @@ def numplot_analysis(df_numerical, fig_cols=3, color_sequence=['darkslateblue',
         num_features = list(df_numerical.columns)
 
     total_cols = len(num_features)
-    fig_cols = fig_cols
     fig_rows = ceil(total_cols / fig_cols)
 
-    # Criando figura de plotagem
-    fig, axs = plt.subplots(nrows=fig_rows, ncols=fig_cols, figsize=(fig_cols * 5, fig_rows * 4.5))
-    sns.despine(left=True)
-    i, j = 0, 0
-
-    # Laço de repetição para plotagem categórica
-    color_idx = 0
-    for col in num_features:
-        # Indexando variáveis e plotando gráfico
-        try:
-            ax = axs[i, j]
-        except:
-            ax = axs[j]
-        target_idx = 0
-
+    # Classes do hue calculadas uma única vez; sem hue, a cor de cada painel segue sua posição na linha
+    codes, classes = hue_groups(df_numerical, hue, order=True)
+    panels = []
+    for k, col in enumerate(num_features):
+        values, groups = grouped_values(df_numerical, col, codes)
         if hue != False:
-            for classe in df_numerical[hue].value_counts().index:
-                df_hue = df_numerical[df_numerical[hue] == classe]
-                sns.distplot(df_hue[col], color=color_hue[target_idx], hist=hist, ax=ax, label=classe)
-                target_idx += 1
-                ax.set_title(col)
+            panels.append((col, values, groups, color_hue, None))
         else:
-            sns.distplot(df_numerical[col], color=color_sequence[color_idx], hist=hist, ax=ax)
-            ax.set_title(col, color=color_sequence[color_idx])
-
-        # Customizando gráfico
-        format_spines(ax, right_border=False)
+            color = color_sequence[(k % fig_cols) % len(color_sequence)]
+            panels.append((col, values, groups, [color], color))
 
-        # Incrementando índices de eixo
-        color_idx += 1
-        j += 1
-        if j == fig_cols:
-            j = 0
-            i += 1
-            color_idx = 0
-
-    # Tratando caso apartado: figura(s) vazia(s)
-    i, j = (0, 0)
-    for n_plots in range(fig_rows * fig_cols):
+    # Criando figura de plotagem
+    grid_plot(numplot_panel, panels, fig_cols, (fig_cols * 5, fig_rows * 4.5), n_jobs=n_jobs,
+              export_dir=export_dir, export_format=export_format, prefix='numplot',
+              panel_kws=dict(classes=classes, hist=hist))
+    plt.show()
 
-        # Se o índice do eixo for maior que a quantidade de features, elimina as bordas
-        if n_plots >= len(num_features):
-            try:
-                axs[i][j].axis('off')
-            except TypeError as e:
-                axs[j].axis('off')
 
-        # Incrementando
-        j += 1
-        if j == fig_cols:
-            j = 0
-            i += 1
+# Painel do catplot_percentage_analysis: representatividade de cada categoria quanto ao hue
+def catplot_percentage_panel(ax, col, col_to_hue, palette='viridis'):
+    col_to_hue.div(col_to_hue.sum(1).astype(float), axis=0).plot(kind='barh', stacked=True, ax=ax,
+                                                                 colormap=palette)
 
-    plt.setp(axs, yticks=[])
-    plt.tight_layout()
-    plt.show()
+    # Customizando gráfico
+    format_spines(ax, right_border=False)
+    ax.set_title(col)
+    ax.set_ylabel('')
 
 
 # Função para plotagem de representatividade de cada categoria quanto a um hue específico
-def catplot_percentage_analysis(df_categorical, hue, fig_cols=2, palette='viridis', figsize=(16, 10)):
+def catplot_percentage_analysis(df_categorical, hue, fig_cols=2, palette='viridis', figsize=(16, 10), n_jobs=1,
+                                export_dir=None, export_format='png', version=None):
     # Retornando parâmetros para organização da figura
     sns.set(style='white', palette='muted', color_codes=True)
     cat_features = list(df_categorical.drop(hue, axis=1).columns)
-    total_cols = len(cat_features)
-    fig_rows = ceil(total_cols / fig_cols)
 
-    # Criando figura de plotagem
-    fig, axs = plt.subplots(nrows=fig_rows, ncols=fig_cols, figsize=(figsize))
-    i, j = 0, 0
-
-    # Laço de repetição para plotagem categórica
-    for col in cat_features:
-        # Indexando variáveis e plotando gráfico
-        try:
-            ax = axs[i, j]
-        except:
-            ax = axs[j]
+    # Tabelas de contingência de todas as colunas calculadas de uma só vez
+    hue_tables = contingency_tables(df_categorical, cat_features, hue, version=version)
 
-        # Aplicando crosstab para análise de representatividade da categoria
-        col_to_hue = pd.crosstab(df_categorical[col], df_categorical[hue])
-        col_to_hue.div(col_to_hue.sum(1).astype(float), axis=0).plot(kind='barh', stacked=True, ax=ax,
-                                                                     colors=palette)
-
-        # Customizando gráfico
-        format_spines(ax, right_border=False)
-        ax.set_title(col)
-        ax.set_ylabel('')
+    # Criando figura de plotagem: painéis desenhados a partir das tabelas de contingência
+    panels = [(col, hue_tables[col]) for col in cat_features]
+    grid_plot(catplot_percentage_panel, panels, fig_cols, figsize, n_jobs=n_jobs, export_dir=export_dir,
+              export_format=export_format, prefix='catplot_percentage', panel_kws=dict(palette=palette))
+    plt.show()
 
-        # Incrementando índices de eixo
-        j += 1
-        if j == fig_cols:
-            j = 0
-            i += 1
 
-    # Tratando caso apartado: figura(s) vazia(s)
-    i, j = (0, 0)
-    for n_plots in range(fig_rows * fig_cols):
+# Função responsável por calcular contagem, soma e média de uma coluna por grupo em uma única passagem
+def grouped_stats(df, group_col, value_col, ascending=False):
+    """
+    Parâmetros
+    ----------
+    df: conjunto de dados [pd.DataFrame]
+    group_col: coluna de agrupamento (ex: seller_id) [str]
+    value_col: coluna numérica agregada [str]
+    ascending: ordem da média no resultado [bool]
 
-        # Se o índice do eixo for maior que a quantidade de features, elimina as bordas
-        if n_plots >= len(cat_features):
-            try:
-                axs[i][j].axis('off')
-            except TypeError as e:
-                axs[j].axis('off')
+    Retorno
+    -------
+    df_stats: uma linha por grupo com count, sum e mean de value_col, ordenada pela média [pd.DataFrame]
+    """
 
-        # Incrementando
-        j += 1
-        if j == fig_cols:
-            j = 0
-            i += 1
+    # Chaves fatorizadas por hash (sem ordenação); nulos na chave ou no valor são ignorados, como no groupby
+    codes, groups = pd.factorize(df[group_col])
+    values = df[value_col].to_numpy(dtype='float64', na_value=np.nan)
+    valid = (codes >= 0) & ~np.isnan(values)
+    count = np.bincount(codes[valid], minlength=len(groups))
+    total = np.bincount(codes[valid], weights=values[valid], minlength=len(groups))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = total / count
 
-    plt.tight_layout()
-    plt.show()
+    # Apenas os grupos (não as linhas) são ordenados
+    order = np.argsort(mean if ascending else -mean, kind='stable')
+    if pd.api.types.is_integer_dtype(df[value_col].dtype):
+        total = total.astype('int64')
+    return pd.DataFrame({group_col: np.asarray(groups)[order], 'count': count[order], 'sum': total[order],
+                         'mean': mean[order]})
 
 
 def mean_sum_analysis(df, group_col, value_col, orient='vertical', palette='plasma', figsize=(15, 6)):
-    # Grouping data
-    df_mean = df.groupby(group_col, as_index=False).mean()
-    df_sum = df.groupby(group_col, as_index=False).sum()
-
-    # Sorting grouped dataframes
-    df_mean.sort_values(by=value_col, ascending=False, inplace=True)
-    sorter = list(df_mean[group_col].values)
-    sorter_idx = dict(zip(sorter, range(len(sorter))))
-    df_sum['mean_rank'] = df_mean[group_col].map(sorter_idx)
-    df_sum.sort_values(by='mean_rank', inplace=True)
-    df_sum.drop('mean_rank', axis=1, inplace=True)
+    # Grouping data: count, sum and mean of value_col only, already sorted by the mean for both panels
+    df_stats = grouped_stats(df, group_col, value_col)
+    df_mean = df_stats[[group_col, 'mean']].rename(columns={'mean': value_col})
+    df_sum = df_stats[[group_col, 'sum']].rename(columns={'sum': value_col})
+    order = list(df_stats[group_col])
 
     # Plotting data
     fig, axs = plt.subplots(ncols=2, figsize=figsize)
     if orient == 'vertical':
-        sns.barplot(x=value_col, y=group_col, data=df_mean, ax=axs[0], palette=palette)
-        sns.barplot(x=value_col, y=group_col, data=df_sum, ax=axs[1], palette=palette)
+        sns.barplot(x=value_col, y=group_col, data=df_mean, ax=axs[0], palette=palette, order=order, orient='h')
+        sns.barplot(x=value_col, y=group_col, data=df_sum, ax=axs[1], palette=palette, order=order, orient='h')
         AnnotateBars(n_dec=0, font_size=12, color='black').horizontal(axs[0])
         AnnotateBars(n_dec=0, font_size=12, color='black').horizontal(axs[1])
     elif orient == 'horizontal':
-        sns.barplot(x=group_col, y=value_col, data=df_mean, ax=axs[0], palette=palette)
-        sns.barplot(x=group_col, y=value_col, data=df_sum, ax=axs[1], palette=palette)
+        sns.barplot(x=group_col, y=value_col, data=df_mean, ax=axs[0], palette=palette, order=order)
+        sns.barplot(x=group_col, y=value_col, data=df_sum, ax=axs[1], palette=palette, order=order)
         AnnotateBars(n_dec=0, font_size=12, color='black').vertical(axs[0])
         AnnotateBars(n_dec=0, font_size=12, color='black').vertical(axs[1])
 